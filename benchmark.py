@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Mede a vazão do execute_numbers contra o WhatsApp falso local (fake_whatsapp.py). "
+                    "Requer Firefox e geckodriver no PATH; não acessa a internet."
+    )
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Quantidades de contatos de cada campanha (padrão: 100 1000 10000)")
+    parser.add_argument("--navegacao", nargs="+", choices=["na_pagina", "recarregar"],
+                        default=["na_pagina", "recarregar"], help="Modos de navegação medidos")
+    parser.add_argument("--latencia", type=float, default=0.05, help="Atraso de cada resposta HTTP (s)")
+    parser.add_argument("--atraso-chat", type=float, default=0.2, help="Atraso até a conversa abrir (s)")
+    parser.add_argument("--atraso-tique", type=float, default=0.3, help="Atraso até o tique de enviada (s)")
+    parser.add_argument("--taxa-invalidos", type=float, default=0.1, help="Fração de números inválidos")
+    parser.add_argument("--resultados-extras", type=int, default=0,
+                        help="Resultados a mais na busca de Nova conversa, que forçam o uso do link")
+    parser.add_argument("--atraso-extras", type=float, default=0.0,
+                        help="Atraso (s) dos resultados a mais, para cobrir resultados que chegam tarde")
+    parser.add_argument("--com-janela", action="store_true", help="Abre o Firefox com janela (padrão: headless)")
+    parser.add_argument("--saida", help="Arquivo JSON onde o resultado é salvo")
+    return parser
+
+
+def gerar_contatos(quantidade, inicio, mensagem):
+    """Contatos sintéticos com celulares válidos e únicos (+55 11 9XXXXXXXX)"""
+    return [
+        {"nome": f"Contato {numero}", "telefone": f"+55119{numero:08d}", "mensagem": mensagem}
+        for numero in range(inicio, inicio + quantidade)
+    ]
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+
+    # Dados (perfil, métricas) em diretório temporário e URL do WhatsApp apontando para o servidor
+    # falso; precisam estar definidos antes de importar os módulos do disparador
+    os.environ["BITTECH_DADOS"] = tempfile.mkdtemp(prefix="bittech_bench_")
+    from fake_whatsapp import ServidorFalso
+    servidor = ServidorFalso(latencia=args.latencia, atraso_chat=args.atraso_chat,
+                             atraso_tique=args.atraso_tique, taxa_invalidos=args.taxa_invalidos,
+                             resultados_extras=args.resultados_extras, atraso_extras=args.atraso_extras).iniciar()
+    os.environ["BITTECH_WHATSAPP_URL"] = servidor.url
+
+    from driver_service import DriverService
+    from message_template import NOME_TEMPLATE_PADRAO, TEMPLATE_PADRAO, MessageTemplate, compilar_campanha
+    from metrics import RegistroMetricas
+    from web_interactor import execute_numbers
+
+    template = compilar_campanha(MessageTemplate(TEMPLATE_PADRAO, NOME_TEMPLATE_PADRAO), "Benchmark", "F")
+    mensagem = template.renderizar({"NOME_PESSOA": "Contato", "EMPRESA": "Empresa"})
+
+    # Todas as campanhas são geradas antes de abrir o navegador, para que a página inicial
+    # já conheça os números que devem aparecer como inválidos
+    campanhas = []
+    proximo = 0
+    for tamanho in args.tamanhos:
+        for modo in args.navegacao:
+            contatos = gerar_contatos(tamanho, proximo, mensagem)
+            proximo += tamanho
+            servidor.marcar_invalidos(contato["telefone"] for contato in contatos)
+            campanhas.append((tamanho, modo, contatos))
+
+    driver_service = DriverService("benchmark", headless=not args.com_janela)
+    resultados = []
+    try:
+        inicio = time.perf_counter()
+        if not driver_service.obter():
+            print("Não foi possível abrir o navegador", file=sys.stderr)
+            return 1
+        sessao = round(time.perf_counter() - inicio, 3)
+        print(f"Sessão aberta em {sessao:.2f}s", file=sys.stderr)
+
+        for tamanho, modo, contatos in campanhas:
+            metricas = RegistroMetricas(diretorio=Path(os.environ["BITTECH_DADOS"]))
+            inicio = time.perf_counter()
+            estatisticas = execute_numbers(contatos, driver_service=driver_service, navegacao=modo,
+                                           campanha_id=f"benchmark-{tamanho}-{modo}", metricas=metricas)
+            duracao = time.perf_counter() - inicio
+            metricas.fechar()
+
+            resultado = {
+                "contatos": tamanho,
+                "navegacao": modo,
+                "duracao_s": round(duracao, 2),
+                "mensagens_por_minuto": round(estatisticas["enviadas"] * 60 / duracao, 1) if duracao else None,
+                "latencia_contato": metricas.percentis("contato_total"),
+                "estatisticas": estatisticas,
+            }
+            resultados.append(resultado)
+            latencia = resultado["latencia_contato"]
+            print(f"{tamanho:>6} contatos  {modo:<10}  {resultado['mensagens_por_minuto']:>7} msg/min  "
+                  f"p50 {latencia['p50']}s  p95 {latencia['p95']}s  p99 {latencia['p99']}s  "
+                  f"falhas {estatisticas['falhas']}", file=sys.stderr)
+    finally:
+        driver_service.encerrar()
+        servidor.parar()
+
+    relatorio = {"sessao_s": sessao, "servidor": vars(args), "resultados": resultados}
+    print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
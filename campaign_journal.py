@@ -0,0 +1,85 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from config import diretorio_dados
+
+ARQUIVO_JOURNAL = "campanhas.db"
+
+STATUS_ENVIADO = "enviado"
+
+
+def gerar_id_campanha(*partes):
+    """Gera um identificador estável de campanha a partir de arquivo, remetente, etc."""
+    texto = "|".join(str(parte) for parte in partes)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()[:16]
+
+
+class CampaignJournal:
+    """
+    Registro persistente (SQLite em modo WAL, somente inserções) de cada tentativa de envio
+
+    Permite retomar uma campanha interrompida pulando os telefones já enviados.
+    """
+
+    def __init__(self, caminho=None):
+        self.caminho = str(caminho or diretorio_dados() / ARQUIVO_JOURNAL)
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS tentativas (
+                id INTEGER PRIMARY KEY,
+                campanha TEXT NOT NULL,
+                telefone TEXT NOT NULL,
+                nome TEXT,
+                status TEXT NOT NULL,
+                motivo TEXT,
+                duracao REAL,
+                criado_em REAL NOT NULL
+            )
+        """)
+        self._conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tentativas_campanha ON tentativas (campanha, telefone)"
+        )
+        self._conexao.commit()
+
+    def registrar(self, campanha, telefone, nome, status, motivo=None, duracao=None):
+        """Grava uma tentativa de envio e seu resultado"""
+        with self._lock:
+            self._conexao.execute(
+                "INSERT INTO tentativas (campanha, telefone, nome, status, motivo, duracao, criado_em)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (campanha, telefone, nome, status, motivo, duracao, time.time())
+            )
+            self._conexao.commit()
+
+    def concluidos(self, campanha):
+        """Retorna o conjunto de telefones já enviados com sucesso na campanha"""
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT DISTINCT telefone FROM tentativas WHERE campanha = ? AND status = ?",
+                (campanha, STATUS_ENVIADO)
+            ).fetchall()
+        return {telefone for (telefone,) in linhas}
+
+    def intervalo_medio(self, limite=500, intervalo_maximo=300):
+        """
+        Tempo médio (s) entre tentativas seguidas de uma mesma campanha, nas últimas `limite`
+
+        Reflete a vazão real (navegação, confirmação, ritmo do agendador). Intervalos maiores que
+        intervalo_maximo (pausas, campanha retomada outro dia) são ignorados. None sem histórico.
+        """
+        with self._lock:
+            (media,) = self._conexao.execute("""
+                SELECT AVG(intervalo) FROM (
+                    SELECT criado_em - LAG(criado_em) OVER (PARTITION BY campanha ORDER BY id) AS intervalo
+                    FROM (SELECT id, campanha, criado_em FROM tentativas ORDER BY id DESC LIMIT ?)
+                ) WHERE intervalo IS NOT NULL AND intervalo <= ?
+            """, (limite, intervalo_maximo)).fetchone()
+        return media
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
@@ -0,0 +1,186 @@
+import os
+import time
+from campaign_journal import gerar_id_campanha
+from message_template import compilar_campanha, saudacao_atual
+from phone_numbers import IndiceTelefones
+from spreadsheet_reader import (PlanilhaInvalida, contar_em_segundo_plano, iterar_contatos, listar_abas,
+                                validar_cabecalho)
+
+
+class CampanhaFila:
+    """
+    Uma planilha (ou aba de uma planilha) na fila, com seu próprio template e remetente
+
+    Args:
+        caminho: Planilha .xlsx ou .csv
+        template: MessageTemplate ainda sem os valores da campanha
+        remetente: Nome do remetente
+        genero: 'M' ou 'F'
+        aba: Aba da planilha .xlsx (None = aba ativa, ou o arquivo CSV inteiro)
+        recomecar: Gera uma campanha nova, sem pular os telefones enviados antes
+    """
+
+    def __init__(self, caminho, template, remetente, genero, aba=None, recomecar=False):
+        self.caminho = caminho
+        self.template = template
+        self.remetente = remetente.strip().title()
+        self.genero = genero
+        self.aba = aba
+        self.resultado = None
+
+        # Mesmo identificador do envio de planilha única, para que os dois retomem a mesma campanha
+        partes = [caminho, self.remetente, genero, template.nome]
+        if aba is not None:
+            partes.append(aba)
+        if recomecar:
+            partes.append(time.time())
+        self.campanha_id = gerar_id_campanha(*partes)
+
+    @property
+    def nome(self):
+        """Nome exibido na interface e nos eventos: arquivo e, se houver, aba"""
+        arquivo = os.path.basename(self.caminho)
+        return f"{arquivo} › {self.aba}" if self.aba is not None else arquivo
+
+
+def _contar_campanha(campanha):
+    """Inicia a contagem das linhas da campanha; retorna uma função que aguarda e devolve o total"""
+    resultado = {}
+    thread = contar_em_segundo_plano(campanha.caminho,
+                                     lambda total, erro=None: resultado.update(total=total, erro=erro),
+                                     campanha.aba)
+
+    def aguardar():
+        thread.join()
+        if resultado["erro"] is not None:
+            raise resultado["erro"]
+        return resultado["total"]
+
+    return aguardar
+
+
+class FilaCampanhas:
+    """
+    Fila de campanhas enviadas em sequência na mesma sessão do WhatsApp Web
+
+    Os telefones são deduplicados entre todas as campanhas da fila por um único
+    IndiceTelefones: um contato presente em duas planilhas recebe só a mensagem da primeira.
+    Os telefones das campanhas concluídas continuam no índice depois que elas saem da fila,
+    para que retomar uma campanha cancelada não os envie de novo.
+    """
+
+    def __init__(self):
+        self.campanhas = []
+        # Telefones das campanhas enviadas até o fim (sem os lidos pela campanha cancelada)
+        self.indice = IndiceTelefones()
+
+    def __len__(self):
+        return len(self.campanhas)
+
+    def __iter__(self):
+        return iter(self.campanhas)
+
+    def adicionar(self, caminho, template, remetente, genero, aba=None, recomecar=False):
+        """Adiciona uma planilha (ou uma aba específica) à fila, validando o cabeçalho"""
+        validar_cabecalho(caminho, aba)
+        campanha = CampanhaFila(caminho, template, remetente, genero, aba, recomecar)
+        self.campanhas.append(campanha)
+        return campanha
+
+    def adicionar_arquivo(self, caminho, template, remetente, genero, recomecar=False):
+        """
+        Adiciona todas as abas de uma planilha que tenham as colunas obrigatórias
+
+        Abas sem as colunas (resumos, gráficos) são ignoradas. Uma planilha com uma única
+        aba entra como a planilha inteira, com o mesmo identificador do envio avulso.
+
+        Returns:
+            list[CampanhaFila]: As campanhas adicionadas
+
+        Raises:
+            PlanilhaInvalida: Se nenhuma aba tiver as colunas obrigatórias
+        """
+        abas = listar_abas(caminho)
+        if len(abas) == 1:
+            return [self.adicionar(caminho, template, remetente, genero, recomecar=recomecar)]
+
+        adicionadas = []
+        for aba in abas:
+            try:
+                adicionadas.append(self.adicionar(caminho, template, remetente, genero, aba, recomecar))
+            except PlanilhaInvalida:
+                continue
+        if not adicionadas:
+            raise PlanilhaInvalida(
+                "Nenhuma aba da planilha contém as colunas necessárias (Nome, Telefone, Empresa)"
+            )
+        return adicionadas
+
+    @property
+    def pendentes(self):
+        """Campanhas ainda não enviadas ou interrompidas por cancelamento"""
+        return [campanha for campanha in self.campanhas
+                if campanha.resultado is None or campanha.resultado["cancelado"]]
+
+    def remover(self, campanha):
+        self.campanhas.remove(campanha)
+
+    def remover_concluidas(self):
+        """Retira da fila as campanhas já enviadas até o fim"""
+        self.campanhas = self.pendentes
+
+    def executar(self, enviar, cancelamento=None, ao_iniciar=None, ao_concluir=None):
+        """
+        Envia as campanhas pendentes da fila em sequência
+
+        A saudação é fixada no início de cada campanha, então uma fila longa acompanha a
+        hora do dia. O cancelamento interrompe a campanha atual e as seguintes não começam.
+
+        Args:
+            enviar: Função (contatos, campanha_id, total, descartados) -> estatísticas, normalmente
+                execute_numbers com o DriverService, journal, métricas e agendador compartilhados;
+                descartados retorna quantas linhas da campanha a preparação já descartou
+            cancelamento: TokenCancelamento compartilhado com o envio
+            ao_iniciar: Função chamada com (posição, campanha, total) antes de cada campanha
+            ao_concluir: Função chamada com (posição, campanha) depois de cada campanha
+
+        Returns:
+            list[CampanhaFila]: As campanhas processadas, com o resultado de cada uma
+                (estatísticas de execute_numbers mais 'invalidos' e 'duplicados')
+        """
+        # pandas só é carregado quando a fila começa a ser enviada
+        from contact_pipeline import montar_contatos
+
+        indice = self.indice.copia()
+        processadas = []
+        pendentes = self.pendentes
+        # A primeira contagem corre enquanto o navegador abre; cada uma das seguintes, durante o
+        # envio da campanha anterior, para a sessão não ficar parada entre as listas
+        contagem = _contar_campanha(pendentes[0]) if pendentes else None
+        for posicao, campanha in enumerate(pendentes, start=1):
+            if cancelamento is not None and cancelamento.cancelado:
+                break
+
+            template = compilar_campanha(campanha.template, campanha.remetente, campanha.genero,
+                                         saudacao_atual())
+            total = contagem()
+            contagem = _contar_campanha(pendentes[posicao]) if posicao < len(pendentes) else None
+            if ao_iniciar:
+                ao_iniciar(posicao, campanha, total)
+
+            invalidos, duplicados, descartados = indice.invalidos, indice.duplicados, indice.descartados
+            contatos = montar_contatos(
+                iterar_contatos(campanha.caminho, campanha.aba), template, indice,
+                (lambda: cancelamento.cancelado) if cancelamento is not None else None
+            )
+            campanha.resultado = {
+                **enviar(contatos, campanha.campanha_id, total, lambda: indice.descartados - descartados),
+                "invalidos": indice.invalidos - invalidos,
+                "duplicados": indice.duplicados - duplicados,
+            }
+            if not campanha.resultado["cancelado"]:
+                self.indice = indice.copia()
+            processadas.append(campanha)
+            if ao_concluir:
+                ao_concluir(posicao, campanha)
+        return processadas
@@ -0,0 +1,43 @@
+import threading
+import time
+
+# Tempo máximo para aguardar o tique de uma mensagem já clicada depois do cancelamento
+PRAZO_CONFIRMACAO_CANCELAMENTO = 5
+
+# Tempo máximo entre o cancelamento e o fim do envio; depois disso o navegador é fechado à força
+PRAZO_ENCERRAMENTO = 15
+
+
+class EnvioCancelado(Exception):
+    """O envio foi interrompido por um pedido de cancelamento"""
+
+
+class TokenCancelamento:
+    """
+    Pedido de cancelamento compartilhado entre a interface e o laço de envio
+
+    As esperas do envio (carregamento, busca, autenticação, agendador) verificam o token a cada
+    poucos décimos de segundo e levantam EnvioCancelado, em vez de esperar o timeout completo.
+    """
+
+    def __init__(self):
+        self._evento = threading.Event()
+        self.cancelado_em = None
+
+    @property
+    def cancelado(self):
+        return self._evento.is_set()
+
+    def cancelar(self):
+        if not self._evento.is_set():
+            self.cancelado_em = time.monotonic()
+            self._evento.set()
+
+    def verificar(self):
+        """Levanta EnvioCancelado se o cancelamento foi pedido"""
+        if self._evento.is_set():
+            raise EnvioCancelado()
+
+    def expirado(self, prazo):
+        """Indica se o cancelamento foi pedido há mais de `prazo` segundos"""
+        return self.cancelado and time.monotonic() - self.cancelado_em >= prazo
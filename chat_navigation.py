@@ -0,0 +1,191 @@
+import re
+from urllib.parse import quote
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
+from session_manager import URL_WHATSAPP
+from wait_engine import CSS_CAIXA_TEXTO, aguardar
+
+# Modos de navegação entre conversas
+NAVEGACAO_NA_PAGINA = "na_pagina"    # Abre a conversa pela busca de "Nova conversa", sem recarregar
+NAVEGACAO_RECARREGAR = "recarregar"  # Carrega send?phone=...&text=... (recarrega o WhatsApp Web)
+
+CSS_NOVA_CONVERSA = 'span[data-icon="new-chat-outline"], span[data-icon="chat"]'
+CSS_BUSCA_NOVA_CONVERSA = 'div[contenteditable="true"][data-tab="3"]'
+CSS_RESULTADO_BUSCA = 'div[role="listitem"], div[role="row"]'
+CSS_LISTA_CONVERSAS = '#pane-side'
+
+# Cola o texto na caixa de mensagem como um evento de "colar", preservando as quebras de linha
+SCRIPT_COLAR_TEXTO = """
+var alvo = document.querySelector(arguments[0]);
+if (!alvo) { return false; }
+alvo.focus();
+var dados = new DataTransfer();
+dados.setData('text/plain', arguments[1]);
+alvo.dispatchEvent(new ClipboardEvent('paste', {clipboardData: dados, bubbles: true, cancelable: true}));
+return true;
+"""
+
+# Resultados da busca de "Nova conversa", ignorando os itens da lista de conversas do painel lateral
+SCRIPT_RESULTADOS_BUSCA = """
+var lista = arguments[1];
+return Array.from(document.querySelectorAll(arguments[0])).filter(function (item) {
+    return !item.closest(lista);
+});
+"""
+
+SCRIPT_TEXTO_CAIXA = """
+var alvo = document.querySelector(arguments[0]);
+return alvo ? (alvo.innerText || '').trim() : null;
+"""
+
+# Identifica a conversa aberta em #main: data-id de uma mensagem (contém o número da conta,
+# ex.: "true_5511987654321@c.us_3EB0...") e o texto do cabeçalho (o número, se não for um contato salvo)
+SCRIPT_IDENTIDADE_CONVERSA = """
+var main = document.querySelector('#main');
+if (!main) { return null; }
+var linha = main.querySelector('[data-id*="@c.us"]');
+var cabecalho = main.querySelector('header');
+return [linha ? linha.getAttribute('data-id') : null, cabecalho ? cabecalho.innerText : ''];
+"""
+
+PADRAO_ID_CONTA = re.compile(r'_(\d+)@c\.us')
+
+
+def link_conversa(telefone, mensagem):
+    """Monta o link send?phone= usado no modo com recarga"""
+    return f'{URL_WHATSAPP}send?phone={telefone}&text={quote(mensagem)}'
+
+
+def buscar_conversa(driver, telefone, timeout=5, cancelamento=None):
+    """
+    Busca o número pelo fluxo de "Nova conversa", sem sair da conversa aberta em #main
+
+    A busca acontece no painel lateral, então pode ser feita enquanto a mensagem anterior
+    ainda aguarda confirmação. Só aceita a busca se ela retornar exatamente um resultado,
+    para nunca abrir a conversa de outra pessoa.
+
+    Returns:
+        WebElement | None: O resultado da busca, ou None se a busca falhou
+
+    Raises:
+        EnvioCancelado: Se o cancelamento for pedido durante a busca
+    """
+    digitos = ''.join(filter(str.isdigit, telefone))
+    try:
+        driver.find_element(By.CSS_SELECTOR, CSS_NOVA_CONVERSA).click()
+        busca = aguardar(driver, timeout, EC.element_to_be_clickable((By.CSS_SELECTOR, CSS_BUSCA_NOVA_CONVERSA)),
+                          cancelamento)
+        busca.send_keys(digitos)
+
+        # A lista de resultados é atualizada de forma assíncrona após a digitação
+        resultados = aguardar(
+            driver, timeout,
+            lambda d: d.execute_script(SCRIPT_RESULTADOS_BUSCA, CSS_RESULTADO_BUSCA, CSS_LISTA_CONVERSAS) or False,
+            cancelamento
+        )
+        if len(resultados) != 1:
+            busca.send_keys(Keys.ESCAPE)
+            return None
+        return resultados[0]
+    except WebDriverException:
+        return None
+
+
+def identidade_conversa(driver):
+    """Retorna (data-id de uma mensagem, texto do cabeçalho) da conversa em #main, ou None"""
+    identidade = driver.execute_script(SCRIPT_IDENTIDADE_CONVERSA)
+    return tuple(identidade) if identidade else None
+
+
+def conversa_do_numero(identidade, digitos):
+    """
+    Indica se a conversa identificada é a do número (somente dígitos, com o código do país)
+
+    Usa o número da conta no data-id das mensagens; numa conversa nova, sem mensagens, usa o
+    cabeçalho, que mostra o número quando ele não é um contato salvo. Sem nenhum dos dois
+    não há como confirmar, e a conversa não é aceita.
+    """
+    if not identidade:
+        return False
+    id_mensagem, cabecalho = identidade
+    if id_mensagem:
+        conta = PADRAO_ID_CONTA.search(id_mensagem)
+        if conta:
+            return conta.group(1) == digitos
+    return ''.join(filter(str.isdigit, cabecalho or '')) == digitos
+
+
+def selecionar_conversa(driver, resultado, telefone, mensagem, timeout=5, cancelamento=None):
+    """
+    Abre a conversa do resultado da busca e cola a mensagem na caixa de texto
+
+    A caixa de texto da conversa anterior continua em #main (e vazia, logo após o envio) até a
+    troca de conversa terminar. Por isso a mensagem só é colada depois que a conversa anterior
+    saiu de #main e a nova é confirmadamente a do número buscado.
+
+    Returns:
+        bool: True se a conversa foi aberta com a mensagem na caixa de texto; False se não abriu
+            ou se abriu a conversa de outro número (o chamador recorre ao link send?phone=)
+    """
+    digitos = ''.join(filter(str.isdigit, telefone))
+    try:
+        caixas = driver.find_elements(By.CSS_SELECTOR, CSS_CAIXA_TEXTO)
+        caixa_anterior = caixas[0] if caixas else None
+        identidade_anterior = identidade_conversa(driver)
+        resultado.click()
+
+        def conversa_pronta(d):
+            trocou = (caixa_anterior is None or EC.staleness_of(caixa_anterior)(d)
+                      or identidade_conversa(d) != identidade_anterior)
+            return (trocou and conversa_do_numero(identidade_conversa(d), digitos)
+                    and d.execute_script(SCRIPT_TEXTO_CAIXA, CSS_CAIXA_TEXTO) == "")
+
+        # Aguarda a conversa do número substituir a anterior, com a caixa de texto vazia, e cola a mensagem
+        aguardar(driver, timeout, conversa_pronta, cancelamento)
+        driver.execute_script(SCRIPT_COLAR_TEXTO, CSS_CAIXA_TEXTO, mensagem)
+        aguardar(driver, timeout, lambda d: bool(driver.execute_script(SCRIPT_TEXTO_CAIXA, CSS_CAIXA_TEXTO)),
+                  cancelamento)
+        return True
+    except WebDriverException:
+        return False
+
+
+def abrir_conversa_na_pagina(driver, telefone, mensagem, timeout=5, cancelamento=None):
+    """
+    Abre a conversa pelo fluxo de "Nova conversa" do WhatsApp Web já carregado e cola a mensagem
+
+    Returns:
+        bool: True se a conversa foi aberta com a mensagem na caixa de texto
+    """
+    resultado = buscar_conversa(driver, telefone, timeout, cancelamento)
+    return resultado is not None and selecionar_conversa(driver, resultado, telefone, mensagem, timeout,
+                                                         cancelamento)
+
+
+def abrir_conversa(driver, telefone, mensagem, modo=NAVEGACAO_NA_PAGINA, resultado_busca=None, cancelamento=None):
+    """
+    Abre a conversa com o número informado já com a mensagem preenchida
+
+    No modo na página, recorre ao link send?phone= (com recarga) se o fluxo interno falhar.
+
+    Args:
+        resultado_busca: Resultado de buscar_conversa já feito antecipadamente (modo na página)
+        cancelamento: TokenCancelamento verificado durante as esperas e antes de carregar o link
+
+    Returns:
+        str: Modo efetivamente usado (NAVEGACAO_NA_PAGINA ou NAVEGACAO_RECARREGAR)
+    """
+    if modo == NAVEGACAO_NA_PAGINA:
+        if resultado_busca is not None:
+            aberta = selecionar_conversa(driver, resultado_busca, telefone, mensagem, cancelamento=cancelamento)
+        else:
+            aberta = abrir_conversa_na_pagina(driver, telefone, mensagem, cancelamento=cancelamento)
+        if aberta:
+            return NAVEGACAO_NA_PAGINA
+
+    if cancelamento is not None:
+        cancelamento.verificar()
+    driver.get(link_conversa(telefone, mensagem))
+    return NAVEGACAO_RECARREGAR
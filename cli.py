@@ -0,0 +1,130 @@
+import argparse
+import json
+import signal
+import sys
+import time
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Disparador de WhatsApp Bittech sem interface gráfica. "
+                    "O progresso é emitido em JSON, um evento por linha, no stdout.",
+        epilog='Exemplo: python cli.py contatos.xlsx clientes.csv --remetente "Maria Silva" --genero F --headless'
+    )
+    parser.add_argument("planilhas", nargs="+", metavar="planilha",
+                        help="Planilhas .xlsx ou .csv com as colunas Nome, Telefone e Empresa, enviadas em sequência "
+                             "na mesma sessão. Todas as abas com essas colunas são enviadas, e cada telefone recebe "
+                             "uma única mensagem entre todas as planilhas")
+    parser.add_argument("--remetente", required=True, help="Nome do remetente")
+    parser.add_argument("--genero", choices=["M", "F"], default="F", help="Gênero do remetente (padrão: F)")
+    parser.add_argument("--template", help="Arquivo .txt com o template (padrão: template embutido)")
+    parser.add_argument("--perfil", default="padrao", help="Perfil persistente do Firefox (padrão: padrao)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Executa o Firefox sem janela (o perfil precisa já estar autenticado)")
+    parser.add_argument("--sem-economia", action="store_true",
+                        help="Carrega imagens e mídia e usa as preferências padrão do Firefox")
+    parser.add_argument("--recarregar-a-cada", type=int, default=300,
+                        help="Recarrega o WhatsApp Web a cada N conversas no modo na_pagina, liberando memória "
+                             "(0 desativa; padrão: 300)")
+    parser.add_argument("--navegacao", choices=["na_pagina", "recarregar"], default="na_pagina",
+                        help="Como abrir cada conversa (padrão: na_pagina)")
+    parser.add_argument("--por-minuto", type=float,
+                        help="Limite de mensagens por minuto, com espaçamento regular (padrão: sem limite)")
+    parser.add_argument("--horario-comercial", action="store_true",
+                        help="Envia só nos períodos de \"Bom dia\" e \"Boa tarde\" (5h às 18h), aguardando fora deles")
+    parser.add_argument("--tentativas", type=int, default=3,
+                        help="Máximo de tentativas por contato em falhas transitórias, repetidas ao final (padrão: 3)")
+    parser.add_argument("--metricas-porta", type=int,
+                        help="Expõe as métricas no formato Prometheus em http://127.0.0.1:PORTA/metrics")
+    parser.add_argument("--recomecar", action="store_true",
+                        help="Ignora o histórico e envia novamente para todos os contatos")
+    return parser
+
+
+def emitir(saida, evento, **dados):
+    """Escreve um evento JSON por linha no stdout original"""
+    saida.write(json.dumps({"evento": evento, "ts": round(time.time(), 3), **dados}, ensure_ascii=False) + "\n")
+    saida.flush()
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+
+    # As mensagens de log do envio vão para o stderr, deixando o stdout só com os eventos JSON
+    saida = sys.stdout
+    sys.stdout = sys.stderr
+
+    # Importações adiadas: --help e erros de argumento não carregam Selenium nem pandas
+    from campaign_journal import CampaignJournal
+    from campaign_queue import FilaCampanhas
+    from cancellation import TokenCancelamento
+    from driver_service import DriverService
+    from metrics import RegistroMetricas
+    from message_template import (HORARIO_COMERCIAL, NOME_TEMPLATE_PADRAO, TEMPLATE_PADRAO, MessageTemplate,
+                                  carregar_template, compilar_campanha)
+    from send_scheduler import AgendadorEnvio
+    from web_interactor import execute_numbers
+
+    # recomecar: campanha nova, nada é pulado, mas tudo continua registrado
+    fila = FilaCampanhas()
+    try:
+        template = (carregar_template(args.template) if args.template
+                    else MessageTemplate(TEMPLATE_PADRAO, NOME_TEMPLATE_PADRAO))
+        compilar_campanha(template, args.remetente, args.genero)
+        for planilha in args.planilhas:
+            fila.adicionar_arquivo(planilha, template, args.remetente, args.genero, args.recomecar)
+    except Exception as e:
+        emitir(saida, "erro", mensagem=str(e))
+        return 2
+
+    journal = CampaignJournal()
+    metricas = RegistroMetricas()
+    if args.metricas_porta:
+        metricas.iniciar_servidor(args.metricas_porta)
+    agendador = AgendadorEnvio(args.por_minuto, HORARIO_COMERCIAL if args.horario_comercial else None)
+
+    # Ctrl+C cancela de forma cooperativa: a mensagem em andamento é concluída, os resultados
+    # são gravados e o navegador é fechado. Um segundo Ctrl+C interrompe imediatamente.
+    cancelamento = TokenCancelamento()
+
+    def cancelar(*_):
+        emitir(saida, "cancelando")
+        cancelamento.cancelar()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, cancelar)
+
+    # O navegador abre e autentica enquanto a planilha é contada e os contatos são preparados;
+    # a mesma sessão é usada por todas as campanhas da fila, sem nova autenticação entre elas
+    driver_service = DriverService(args.perfil, headless=args.headless, economia=not args.sem_economia)
+    driver_service.aquecer(cancelamento)
+    try:
+        def progresso(atual, total, status, success=True):
+            emitir(saida, "progresso", atual=atual, total=total, status=status, sucesso=success)
+
+        def enviar(contatos, campanha_id, total, descartados):
+            return execute_numbers(
+                contatos, progresso, driver_service, navegacao=args.navegacao,
+                journal=journal, campanha_id=campanha_id, total=total, metricas=metricas, agendador=agendador,
+                cancelamento=cancelamento, tentativas=args.tentativas, recarregar_a_cada=args.recarregar_a_cada,
+                descartados=descartados
+            )
+
+        def iniciar(posicao, campanha, total):
+            emitir(saida, "inicio", campanha=campanha.campanha_id, total=total, planilha=campanha.caminho,
+                   aba=campanha.aba, posicao=posicao, campanhas=len(fila))
+
+        def concluir(posicao, campanha):
+            emitir(saida, "resultado", campanha=campanha.campanha_id, planilha=campanha.caminho,
+                   aba=campanha.aba, percentis=metricas.resumo(), **campanha.resultado)
+
+        fila.executar(enviar, cancelamento, iniciar, concluir)
+        return 130 if cancelamento.cancelado else 0
+    finally:
+        driver_service.encerrar()
+        journal.fechar()
+        metricas.fechar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
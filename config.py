@@ -0,0 +1,15 @@
+import os
+from pathlib import Path
+
+# Diretório onde o aplicativo guarda perfis do navegador, caches e registros
+DIRETORIO_DADOS = Path(os.environ.get("BITTECH_DADOS", Path.home() / ".bittech_disparador"))
+
+# Perfil persistente do Firefox usado quando nenhum outro é informado
+PERFIL_PADRAO = "padrao"
+
+
+def diretorio_dados(*partes):
+    """Retorna (e cria, se necessário) um subdiretório do diretório de dados"""
+    caminho = DIRETORIO_DADOS.joinpath(*partes)
+    caminho.mkdir(parents=True, exist_ok=True)
+    return caminho
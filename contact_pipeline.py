@@ -0,0 +1,130 @@
+from itertools import islice
+import pandas as pd
+from phone_numbers import IndiceTelefones, normalizar_serie
+from spreadsheet_reader import COLUNAS_OBRIGATORIAS
+
+# Quantidade de linhas preparadas de uma vez pelas operações vetorizadas
+TAMANHO_LOTE = 20000
+
+# Situação de cada linha da planilha após a preparação
+STATUS_VALIDO = "valido"
+STATUS_INCOMPLETO = "incompleto"      # Nome, telefone ou empresa vazios
+STATUS_INVALIDO = "numero_invalido"   # Telefone rejeitado pela validação
+STATUS_DUPLICADO = "duplicado"        # Telefone já visto (nesta ou em outra planilha do índice)
+
+
+def classificar_lote(linhas, indice):
+    """
+    Prepara um lote de linhas da planilha com operações de coluna, mantendo todas as linhas
+
+    Normaliza nome e empresa, valida os telefones (chave E.164) e marca a situação de cada
+    linha em vez de descartá-la, para a prévia da campanha poder exibi-las.
+
+    Args:
+        linhas: Sequência de dicionários {'Nome', 'Telefone', 'Empresa'}
+        indice: IndiceTelefones compartilhado entre os lotes (e entre planilhas)
+
+    Returns:
+        pd.DataFrame: Colunas 'nome', 'telefone_original', 'telefone', 'empresa' e 'status'
+    """
+    dados = pd.DataFrame.from_records(linhas, columns=COLUNAS_OBRIGATORIAS).astype("string")
+    dados = dados.apply(lambda coluna: coluna.str.strip()).replace("", pd.NA)
+
+    incompletos = dados.isna().any(axis=1)
+    indice.incompletos += int(incompletos.sum())
+
+    tabela = pd.DataFrame({
+        "nome": dados["Nome"].str.title(),
+        "telefone_original": dados["Telefone"],
+        "telefone": normalizar_serie(dados["Telefone"].where(~incompletos)),
+        "empresa": dados["Empresa"].str.title(),
+        "status": STATUS_VALIDO,
+    })
+    tabela.loc[incompletos, "status"] = STATUS_INCOMPLETO
+
+    invalidos = ~incompletos & tabela["telefone"].isna()
+    indice.invalidos += int(invalidos.sum())
+    tabela.loc[invalidos, "status"] = STATUS_INVALIDO
+
+    candidatos = tabela["status"] == STATUS_VALIDO
+    novos = indice.filtrar_novos(tabela.loc[candidatos, "telefone"])
+    tabela.loc[novos[~novos].index, "status"] = STATUS_DUPLICADO
+    return tabela
+
+
+def preparar_lote(linhas, indice):
+    """
+    Prepara um lote de linhas da planilha com operações de coluna
+
+    Descarta linhas com campos vazios, normaliza nome e empresa, valida os telefones
+    (chave E.164) e remove os números inválidos ou já vistos no índice.
+
+    Args:
+        linhas: Sequência de dicionários {'Nome', 'Telefone', 'Empresa'}
+        indice: IndiceTelefones compartilhado entre os lotes (e entre planilhas)
+
+    Returns:
+        pd.DataFrame: Tabela com as colunas 'nome', 'telefone' e 'empresa'
+    """
+    tabela = classificar_lote(linhas, indice)
+    tabela = tabela[tabela["status"] == STATUS_VALIDO]
+    return tabela[["nome", "telefone", "empresa"]].reset_index(drop=True)
+
+
+def classificar_contatos(linhas, indice=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Gera as tabelas de classificar_lote (todas as linhas, com a situação de cada uma), um lote por vez
+
+    Args:
+        linhas: Iterável de dicionários {'Nome', 'Telefone', 'Empresa'}
+        indice: IndiceTelefones para deduplicar (um novo índice é criado se omitido)
+    """
+    indice = indice if indice is not None else IndiceTelefones()
+    linhas = iter(linhas)
+    while True:
+        lote = list(islice(linhas, tamanho_lote))
+        if not lote:
+            return
+        yield classificar_lote(lote, indice)
+
+
+def preparar_contatos(linhas, indice=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Gera as tabelas de contatos preparadas, um lote por vez
+
+    Args:
+        linhas: Iterável de dicionários {'Nome', 'Telefone', 'Empresa'}
+        indice: IndiceTelefones para deduplicar (um novo índice é criado se omitido)
+    """
+    indice = indice if indice is not None else IndiceTelefones()
+    linhas = iter(linhas)
+    while True:
+        lote = list(islice(linhas, tamanho_lote))
+        if not lote:
+            return
+        yield preparar_lote(lote, indice)
+
+
+def montar_contatos(linhas, template, indice=None, deve_parar=None):
+    """
+    Gera os contatos prontos para execute_numbers, renderizando cada mensagem sob demanda
+
+    Args:
+        linhas: Iterável de dicionários {'Nome', 'Telefone', 'Empresa'}
+        template: MessageTemplate com os valores da campanha já fixados (compilar_campanha)
+        indice: IndiceTelefones para deduplicar
+        deve_parar: Função opcional; quando retornar True, a geração é interrompida
+
+    Yields:
+        dict: {'nome', 'telefone', 'mensagem'}
+    """
+    for tabela in preparar_contatos(linhas, indice):
+        for nome, telefone, empresa in zip(tabela["nome"], tabela["telefone"], tabela["empresa"]):
+            if deve_parar and deve_parar():
+                return
+
+            yield {
+                "nome": nome,
+                "telefone": telefone,
+                "mensagem": template.renderizar({"NOME_PESSOA": nome, "EMPRESA": empresa}),
+            }
@@ -0,0 +1,76 @@
+import queue
+import threading
+
+# Quantidade de contatos preparados com antecedência pela thread produtora
+CAPACIDADE_FILA = 500
+
+# Intervalo (em segundos) em que a thread produtora verifica se o consumidor desistiu
+INTERVALO_VERIFICACAO = 0.5
+
+_FIM = object()
+
+
+class _Erro:
+    def __init__(self, excecao):
+        self.excecao = excecao
+
+
+class ProdutorContatos:
+    """
+    Consome um iterável de contatos numa thread produtora, com uma fila limitada
+
+    A leitura da planilha, a preparação (pandas) e a renderização das mensagens acontecem
+    em paralelo com a abertura do navegador e com os envios. A thread começa ao criar o
+    objeto, antes do primeiro contato ser pedido. Erros da produção são relançados no
+    consumidor, na posição em que ocorreram.
+    """
+
+    def __init__(self, contatos, capacidade=CAPACIDADE_FILA):
+        self._contatos = contatos
+        self._fila = queue.Queue(capacidade)
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._produzir, daemon=True)
+        self._thread.start()
+
+    def _colocar(self, item):
+        while not self._parar.is_set():
+            try:
+                self._fila.put(item, timeout=INTERVALO_VERIFICACAO)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produzir(self):
+        try:
+            for contato in self._contatos:
+                if not self._colocar(contato):
+                    return
+        except Exception as e:
+            self._colocar(_Erro(e))
+            return
+        finally:
+            # Fecha a origem (planilha, conexão SQLite da prévia) na própria thread que a leu
+            fechar = getattr(self._contatos, "close", None)
+            if fechar:
+                fechar()
+        self._colocar(_FIM)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._parar.is_set():
+            raise StopIteration
+        item = self._fila.get()
+        if item is _FIM:
+            self._parar.set()
+            raise StopIteration
+        if isinstance(item, _Erro):
+            self._parar.set()
+            raise item.excecao
+        return item
+
+    def fechar(self):
+        """Interrompe a produção; os contatos ainda na fila são descartados"""
+        self._parar.set()
@@ -0,0 +1,114 @@
+import threading
+from config import PERFIL_PADRAO
+
+# Intervalo (em segundos) para reavaliar o cancelamento enquanto outra thread abre a sessão
+INTERVALO_ESPERA_SESSAO = 0.5
+
+
+class DriverService:
+    """
+    Mantém uma sessão do WhatsApp Web aberta entre campanhas, reconectando sob demanda
+
+    O Selenium só é importado ao abrir o navegador pela primeira vez, então criar o serviço
+    na inicialização do aplicativo não atrasa a exibição da janela.
+    """
+
+    def __init__(self, perfil=PERFIL_PADRAO, timeout_saude=5, headless=False, economia=True):
+        self.perfil = perfil
+        self.headless = headless
+        self.economia = economia
+        self.timeout_saude = timeout_saude
+        self._driver = None
+        self._lock = threading.Lock()
+
+    def saudavel(self):
+        """Verifica se a aba ainda responde e se o WhatsApp continua logado"""
+        if self._driver is None:
+            return False
+
+        from selenium.webdriver.common.by import By
+        from session_manager import CSS_PAINEL_LATERAL
+
+        try:
+            self._driver.set_script_timeout(self.timeout_saude)
+            if self._driver.execute_script("return document.readyState") != "complete":
+                return False
+            return bool(self._driver.find_elements(By.CSS_SELECTOR, CSS_PAINEL_LATERAL))
+        except Exception:  # WebDriverException ou falha de conexão com um navegador já encerrado
+            return False
+
+    def obter(self, cancelamento=None):
+        """
+        Retorna um driver autenticado, abrindo ou reabrindo o navegador apenas se necessário
+
+        Args:
+            cancelamento: TokenCancelamento; se pedido antes ou durante a abertura, retorna None
+        """
+        from web_interactor import iniciar_sessao_whatsapp
+
+        while not self._lock.acquire(timeout=INTERVALO_ESPERA_SESSAO):
+            if cancelamento is not None and cancelamento.cancelado:
+                return None
+        try:
+            # Cancelado enquanto aguardava a sessão: não abre um navegador só para fechá-lo em seguida
+            if cancelamento is not None and cancelamento.cancelado:
+                return None
+
+            if self.saudavel():
+                return self._driver
+
+            if self._driver is not None:
+                print("Sessão do WhatsApp indisponível, reconectando...")
+                self._fechar()
+
+            self._driver = iniciar_sessao_whatsapp(self.perfil, self.headless, cancelamento, self.economia)
+            return self._driver
+        finally:
+            self._lock.release()
+
+    def aquecer(self, cancelamento=None):
+        """
+        Abre a sessão em segundo plano enquanto a campanha ainda está sendo preparada
+
+        Uma chamada seguinte a obter() aguarda essa abertura em vez de iniciar outra.
+        """
+        thread = threading.Thread(target=self.obter, args=(cancelamento,), daemon=True)
+        thread.start()
+        return thread
+
+    def interromper(self):
+        """
+        Fecha o navegador sem aguardar o lock
+
+        Usado quando o envio não atende ao cancelamento no prazo (por exemplo, preso em um
+        comando do navegador): o comando em andamento falha e a thread de envio termina.
+        A próxima chamada a obter() abre uma nova sessão.
+        """
+        driver = self._driver
+        if driver is None:
+            return
+        print("\nEncerrando o navegador à força...")
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Erro ao fechar o navegador: {e}")
+
+    def descartar(self):
+        """Fecha o navegador atual; a próxima chamada a obter() abre uma nova sessão"""
+        with self._lock:
+            self._fechar()
+
+    def encerrar(self):
+        """Encerra definitivamente o navegador (chamado ao fechar o aplicativo)"""
+        self.descartar()
+
+    def _fechar(self):
+        if self._driver is None:
+            return
+        print("\nFechando o navegador...")
+        try:
+            self._driver.quit()
+        except Exception as e:  # Inclui falhas de conexão se o navegador já foi interrompido
+            print(f"Erro ao fechar o navegador: {e}")
+        finally:
+            self._driver = None
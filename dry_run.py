@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from config import diretorio_dados
+from contact_pipeline import STATUS_DUPLICADO, STATUS_INCOMPLETO, STATUS_INVALIDO, STATUS_VALIDO, classificar_contatos
+from spreadsheet_reader import iterar_contatos
+
+# Quantidade de linhas exibidas por página na prévia
+TAMANHO_PAGINA = 50
+
+# Linhas lidas do cache de uma vez ao alimentar o envio
+LOTE_LEITURA = 1000
+
+
+def caminho_previa(campanha_id):
+    """Arquivo do cache de prévia da campanha"""
+    return diretorio_dados("previas") / f"{campanha_id}.db"
+
+
+def _assinatura_planilha(caminho_planilha):
+    estado = os.stat(caminho_planilha)
+    return {"planilha": os.path.abspath(caminho_planilha), "tamanho": estado.st_size, "modificado": estado.st_mtime}
+
+
+def _hash_template(template):
+    return hashlib.sha1(template.texto.encode("utf-8")).hexdigest()
+
+
+def _dicionario(template):
+    """
+    Trechos fixos do template da campanha, usados como dicionário do zlib
+
+    Cada mensagem renderizada é comprimida em poucas dezenas de bytes, pois só os valores
+    do contato não estão no dicionário. O zlib usa no máximo 32 KB, então os textos mais
+    longos ficam só com o final (8192 caracteres ocupam no máximo 32 KB em UTF-8).
+    """
+    return "".join(trecho for trecho, _ in template.segmentos)[-8192:]
+
+
+def gerar_previa(caminho_planilha, template, campanha_id, indice=None, progresso=None, deve_parar=None):
+    """
+    Prepara e renderiza a planilha inteira num cache em disco (SQLite), sem enviar nada
+
+    Cada linha guarda nome, telefone original, chave E.164, situação (contact_pipeline.STATUS_*)
+    e, para as válidas, a mensagem renderizada comprimida.
+
+    Args:
+        template: MessageTemplate com os valores da campanha já fixados (compilar_campanha)
+        indice: IndiceTelefones para deduplicar (compartilhado com outras planilhas, se houver)
+        progresso: Função chamada com a quantidade de linhas processadas a cada lote
+        deve_parar: Função; quando retorna True a geração é abandonada e nada é gravado
+
+    Returns:
+        PreviaCampanha | None: None se a geração foi interrompida
+    """
+    destino = caminho_previa(campanha_id)
+    temporario = destino.with_suffix(".tmp")
+    if temporario.exists():
+        temporario.unlink()
+
+    dicionario = _dicionario(template)
+    dicionario_bytes = dicionario.encode("utf-8")
+    contagem = {STATUS_VALIDO: 0, STATUS_INVALIDO: 0, STATUS_DUPLICADO: 0, STATUS_INCOMPLETO: 0}
+    conexao = sqlite3.connect(temporario)
+    try:
+        conexao.execute("""
+            CREATE TABLE contatos (
+                posicao INTEGER PRIMARY KEY,
+                nome TEXT,
+                telefone_original TEXT,
+                telefone TEXT,
+                status TEXT NOT NULL,
+                mensagem BLOB
+            )
+        """)
+        conexao.execute("CREATE TABLE meta (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+
+        posicao = 0
+        for tabela in classificar_contatos(iterar_contatos(caminho_planilha), indice):
+            if deve_parar and deve_parar():
+                conexao.close()
+                temporario.unlink()
+                return None
+
+            linhas = []
+            for nome, original, telefone, empresa, status in zip(
+                    tabela["nome"], tabela["telefone_original"], tabela["telefone"], tabela["empresa"],
+                    tabela["status"]):
+                posicao += 1
+                contagem[status] += 1
+                mensagem = None
+                if status == STATUS_VALIDO:
+                    compressor = zlib.compressobj(9, zdict=dicionario_bytes)
+                    texto = template.renderizar({"NOME_PESSOA": nome, "EMPRESA": empresa})
+                    mensagem = compressor.compress(texto.encode("utf-8")) + compressor.flush()
+                linhas.append((posicao, _texto(nome), _texto(original), _texto(telefone), status, mensagem))
+            conexao.executemany("INSERT INTO contatos VALUES (?, ?, ?, ?, ?, ?)", linhas)
+            if progresso:
+                progresso(posicao)
+
+        meta = {
+            **_assinatura_planilha(caminho_planilha),
+            "campanha": campanha_id,
+            "template": _hash_template(template),
+            "dicionario": dicionario,
+            "contagem": contagem,
+            "total": posicao,
+            "criado_em": time.time(),
+        }
+        conexao.executemany("INSERT INTO meta VALUES (?, ?)",
+                            [(chave, json.dumps(valor, ensure_ascii=False)) for chave, valor in meta.items()])
+        conexao.commit()
+    finally:
+        conexao.close()
+
+    os.replace(temporario, destino)
+    return PreviaCampanha(destino)
+
+
+def _texto(valor):
+    """Converte os valores ausentes do pandas (pd.NA) em None para o SQLite"""
+    return valor if isinstance(valor, str) else None
+
+
+def estimar_duracao(quantidade, intervalo_por_contato, mensagens_por_minuto=None):
+    """
+    Estima a duração (s) do envio a partir da vazão registrada em campanhas anteriores
+
+    Args:
+        intervalo_por_contato: Tempo médio entre envios (CampaignJournal.intervalo_medio)
+        mensagens_por_minuto: Limite do agendador, se houver; o envio não será mais rápido que ele
+    """
+    if not intervalo_por_contato:
+        return None
+    if mensagens_por_minuto:
+        intervalo_por_contato = max(intervalo_por_contato, 60 / mensagens_por_minuto)
+    return quantidade * intervalo_por_contato
+
+
+class PreviaCampanha:
+    """
+    Cache em disco da campanha renderizada
+
+    A interface pagina as linhas sob demanda (pagina) e o envio consome os contatos válidos
+    na ordem da planilha (contatos), sem repetir a preparação.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.meta = {chave: json.loads(valor) for chave, valor in self._conexao.execute("SELECT chave, valor FROM meta")}
+        self._dicionario = self.meta["dicionario"].encode("utf-8")
+
+    @property
+    def total(self):
+        return self.meta["total"]
+
+    @property
+    def contagem(self):
+        """Quantidade de linhas por situação (contact_pipeline.STATUS_*)"""
+        return self.meta["contagem"]
+
+    @property
+    def validos(self):
+        return self.contagem[STATUS_VALIDO]
+
+    def atual(self, caminho_planilha, template):
+        """Indica se o cache ainda corresponde à planilha (tamanho e data) e ao template"""
+        try:
+            assinatura = _assinatura_planilha(caminho_planilha)
+        except OSError:
+            return False
+        return (all(self.meta.get(chave) == valor for chave, valor in assinatura.items())
+                and self.meta.get("template") == _hash_template(template))
+
+    def _mensagem(self, dados):
+        if dados is None:
+            return None
+        descompressor = zlib.decompressobj(zdict=self._dicionario)
+        return (descompressor.decompress(dados) + descompressor.flush()).decode("utf-8")
+
+    def pagina(self, numero, tamanho=TAMANHO_PAGINA):
+        """
+        Retorna as linhas de uma página (a partir de 0), com as mensagens já descomprimidas
+
+        Returns:
+            list[dict]: {'posicao', 'nome', 'telefone_original', 'telefone', 'status', 'mensagem'}
+        """
+        inicio = numero * tamanho + 1
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT posicao, nome, telefone_original, telefone, status, mensagem FROM contatos"
+                " WHERE posicao BETWEEN ? AND ? ORDER BY posicao",
+                (inicio, inicio + tamanho - 1)
+            ).fetchall()
+        return [
+            {"posicao": posicao, "nome": nome, "telefone_original": original, "telefone": telefone,
+             "status": status, "mensagem": self._mensagem(mensagem)}
+            for posicao, nome, original, telefone, status, mensagem in linhas
+        ]
+
+    def paginas(self, tamanho=TAMANHO_PAGINA):
+        return max(1, -(-self.total // tamanho))
+
+    def contatos(self):
+        """
+        Gera os contatos válidos prontos para execute_numbers, lendo o cache em lotes
+
+        Usa uma conexão própria, para poder ser consumido por outra thread enquanto a
+        interface continua paginando.
+
+        Yields:
+            dict: {'nome', 'telefone', 'mensagem'}
+        """
+        conexao = sqlite3.connect(self.caminho)
+        try:
+            cursor = conexao.execute(
+                "SELECT nome, telefone, mensagem FROM contatos WHERE status = ? ORDER BY posicao", (STATUS_VALIDO,)
+            )
+            while True:
+                linhas = cursor.fetchmany(LOTE_LEITURA)
+                if not linhas:
+                    return
+                for nome, telefone, mensagem in linhas:
+                    yield {"nome": nome, "telefone": telefone, "mensagem": self._mensagem(mensagem)}
+        finally:
+            conexao.close()
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
@@ -0,0 +1,282 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Página única que imita o DOM usado pelo disparador: #side (com #pane-side), "Nova conversa",
+# #main com o footer da caixa de texto e o botão de enviar no mesmo XPath do WhatsApp Web,
+# bolhas .message-out com os tiques e o aviso de número inválido.
+PAGINA = """<!DOCTYPE html>
+<html lang="pt-br">
+<head><meta charset="utf-8"><title>WhatsApp (falso)</title>
+<style>
+  body { font-family: sans-serif; display: flex; margin: 0; }
+  #side { width: 30%; border-right: 1px solid #ccc; min-height: 100vh; }
+  #app-main { flex: 1; }
+  .message-out { background: #dcf8c6; margin: 4px; padding: 4px; }
+  [contenteditable] { border: 1px solid #999; min-height: 2em; white-space: pre-wrap; }
+  div[data-animate-modal-popup] { position: fixed; top: 30%; left: 30%; background: #fff; border: 1px solid #000; padding: 1em; }
+</style>
+</head>
+<body>
+<div id="side">
+  <header><button id="nova-conversa"><span data-icon="new-chat-outline">Nova conversa</span></button></header>
+  <div id="drawer" style="display:none">
+    <div contenteditable="true" data-tab="3" id="busca"></div>
+    <div id="resultados"></div>
+  </div>
+  <div id="pane-side"><div role="listitem">Conversa antiga</div></div>
+</div>
+<div id="app-main"></div>
+<script>
+var CONFIG = __CONFIG__;
+var contador = 0;
+var conversaAtual = null;
+var buscasPendentes = [];
+
+function invalido(telefone) {
+  var digitos = telefone.replace(/\\D/g, '');
+  return CONFIG.invalidos.indexOf(digitos) >= 0;
+}
+
+// Como no WhatsApp Web, a conversa anterior (com a caixa de texto vazia) continua em #main
+// até a nova terminar de carregar
+function abrirConversa(telefone, texto) {
+  var area = document.getElementById('app-main');
+  setTimeout(function () {
+    if (invalido(telefone)) {
+      var aviso = document.createElement('div');
+      aviso.setAttribute('data-animate-modal-popup', 'true');
+      aviso.innerHTML = '<div>O número de telefone compartilhado por url é inválido.</div><button>OK</button>';
+      aviso.querySelector('button').onclick = function () { aviso.remove(); };
+      document.body.appendChild(aviso);
+      return;
+    }
+    conversaAtual = telefone.replace(/\\D/g, '');
+    area.innerHTML =
+      '<div id="main"><header><span id="titulo"></span></header><div class="mensagens"></div>' +
+      '<footer><div><div><span><div>' +
+      '<div><div contenteditable="true" data-tab="10" id="caixa"></div></div>' +
+      '<div><div></div><div><button id="enviar" style="display:none"><span data-icon="send">Enviar</span></button></div></div>' +
+      '</div></span></div></div></footer></div>';
+    document.getElementById('titulo').innerText = '+' + conversaAtual;
+    var caixa = document.getElementById('caixa');
+    caixa.innerText = texto || '';
+    atualizarBotao();
+    caixa.addEventListener('input', atualizarBotao);
+    caixa.addEventListener('paste', function (evento) {
+      evento.preventDefault();
+      caixa.innerText = evento.clipboardData.getData('text/plain');
+      atualizarBotao();
+    });
+    document.getElementById('enviar').onclick = enviar;
+  }, CONFIG.atraso_chat_ms);
+}
+
+function atualizarBotao() {
+  var caixa = document.getElementById('caixa');
+  document.getElementById('enviar').style.display = caixa.innerText.trim() ? '' : 'none';
+}
+
+function enviar() {
+  var caixa = document.getElementById('caixa');
+  var linha = document.createElement('div');
+  contador += 1;
+  linha.setAttribute('data-id', 'true_' + conversaAtual + '@c.us_' + Date.now() + '_' + contador);
+  linha.innerHTML = '<div class="message-out"><span class="texto"></span><span data-icon="msg-time"></span></div>';
+  linha.querySelector('.texto').innerText = caixa.innerText;
+  document.querySelector('#main .mensagens').appendChild(linha);
+  caixa.innerText = '';
+  atualizarBotao();
+  var icone = linha.querySelector('span[data-icon]');
+  setTimeout(function () { icone.setAttribute('data-icon', 'msg-check'); }, CONFIG.atraso_tique_ms);
+  setTimeout(function () { icone.setAttribute('data-icon', 'msg-dblcheck'); }, CONFIG.atraso_tique_ms * 2);
+}
+
+document.querySelector('#nova-conversa').onclick = function () {
+  var busca = document.getElementById('busca');
+  busca.innerText = '';
+  document.getElementById('resultados').innerHTML = '';
+  document.getElementById('drawer').style.display = '';
+  busca.focus();
+};
+
+// Como no WhatsApp Web, cada tecla cancela a busca anterior: só a consulta final gera resultados
+document.getElementById('busca').addEventListener('input', function () {
+  var digitos = this.innerText.replace(/\\D/g, '');
+  var resultados = document.getElementById('resultados');
+  buscasPendentes.forEach(clearTimeout);
+  buscasPendentes = [];
+  resultados.innerHTML = '';
+  if (digitos.length < 10 || invalido(digitos)) { return; }
+  buscasPendentes.push(setTimeout(function () { adicionarResultado(resultados, digitos); },
+                                  CONFIG.atraso_busca_ms));
+
+  // Resultados a mais (outros contatos com números parecidos), junto com o primeiro ou depois dele
+  for (var extra = 1; extra <= CONFIG.resultados_extras; extra++) {
+    (function (outro) {
+      buscasPendentes.push(setTimeout(function () { adicionarResultado(resultados, outro); },
+                                      CONFIG.atraso_busca_ms + CONFIG.atraso_extras_ms));
+    })(digitos.slice(0, -1) + ((Number(digitos.slice(-1)) + extra) % 10));
+  }
+});
+
+function adicionarResultado(resultados, digitos) {
+  var item = document.createElement('div');
+  item.setAttribute('role', 'listitem');
+  item.innerText = '+' + digitos;
+  item.onclick = function () {
+    document.getElementById('drawer').style.display = 'none';
+    abrirConversa(digitos, '');
+  };
+  resultados.appendChild(item);
+}
+
+if (CONFIG.telefone !== null) {
+  abrirConversa(CONFIG.telefone, CONFIG.texto);
+}
+</script>
+</body>
+</html>
+"""
+
+
+def numero_invalido(telefone, taxa_invalidos):
+    """Decide de forma determinística (hash do número) se o telefone "não tem WhatsApp" """
+    digitos = "".join(filter(str.isdigit, telefone))
+    resumo = int(hashlib.sha1(digitos.encode()).hexdigest()[:8], 16)
+    return (resumo % 10000) < taxa_invalidos * 10000
+
+
+class ServidorFalso:
+    """
+    Servidor local que imita o WhatsApp Web para medir o disparador sem uma conta real
+
+    Args:
+        latencia: Atraso (s) de cada resposta HTTP, simulando o carregamento da página
+        atraso_chat: Atraso (s) até a conversa aparecer em #main
+        atraso_busca: Atraso (s) até o resultado da busca de "Nova conversa"
+        atraso_tique: Atraso (s) até a mensagem pendente receber o tique de enviada
+        taxa_invalidos: Fração dos números que exibem o aviso de número inválido
+        resultados_extras: Resultados a mais na busca (outros números parecidos), que o disparador
+            deve recusar por não serem exatamente um
+        atraso_extras: Atraso (s) dos resultados a mais em relação ao primeiro; com atraso, a busca
+            mostra um único resultado por um instante antes de os outros chegarem
+    """
+
+    def __init__(self, porta=0, host="127.0.0.1", latencia=0.0, atraso_chat=0.2, atraso_busca=0.1,
+                 atraso_tique=0.3, taxa_invalidos=0.0, resultados_extras=0, atraso_extras=0.0):
+        self.latencia = latencia
+        self.atraso_chat = atraso_chat
+        self.atraso_busca = atraso_busca
+        self.atraso_tique = atraso_tique
+        self.taxa_invalidos = taxa_invalidos
+        self.resultados_extras = resultados_extras
+        self.atraso_extras = atraso_extras
+        self.invalidos = set()
+        self.requisicoes = 0
+        self._servidor = ThreadingHTTPServer((host, porta), self._criar_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/"
+
+    def marcar_invalidos(self, telefones):
+        """Registra quais números da lista devem aparecer como inválidos (segundo taxa_invalidos)"""
+        for telefone in telefones:
+            if numero_invalido(telefone, self.taxa_invalidos):
+                self.invalidos.add("".join(filter(str.isdigit, telefone)))
+
+    def pagina(self, telefone=None, texto=None):
+        config = {
+            "telefone": telefone,
+            "texto": texto,
+            "invalidos": sorted(self.invalidos),
+            "atraso_chat_ms": int(self.atraso_chat * 1000),
+            "atraso_busca_ms": int(self.atraso_busca * 1000),
+            "atraso_tique_ms": int(self.atraso_tique * 1000),
+            "resultados_extras": self.resultados_extras,
+            "atraso_extras_ms": int(self.atraso_extras * 1000),
+        }
+        # Evita que "</script>" dentro do texto feche o script da página
+        return PAGINA.replace("__CONFIG__", json.dumps(config).replace("</", "<\\/"))
+
+    def _criar_handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                servidor.requisicoes += 1
+                url = urlparse(self.path)
+                if url.path not in ("/", "/send"):
+                    self.send_error(404)
+                    return
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+
+                parametros = parse_qs(url.query)
+                telefone = parametros.get("phone", [None])[0] if url.path == "/send" else None
+                if telefone is not None and numero_invalido(telefone, servidor.taxa_invalidos):
+                    servidor.invalidos.add("".join(filter(str.isdigit, telefone)))
+                texto = parametros.get("text", [""])[0]
+
+                corpo = servidor.pagina(telefone, texto).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def servir_para_sempre(self):
+        """Atende as requisições na thread atual até Ctrl+C"""
+        try:
+            self._servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._servidor.server_close()
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita o WhatsApp Web para testes e benchmarks")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso de cada resposta HTTP (s)")
+    parser.add_argument("--atraso-chat", type=float, default=0.2, help="Atraso até a conversa abrir (s)")
+    parser.add_argument("--atraso-busca", type=float, default=0.1, help="Atraso do resultado da busca (s)")
+    parser.add_argument("--atraso-tique", type=float, default=0.3, help="Atraso até o tique de enviada (s)")
+    parser.add_argument("--taxa-invalidos", type=float, default=0.0, help="Fração de números inválidos (0 a 1)")
+    parser.add_argument("--resultados-extras", type=int, default=0,
+                        help="Resultados a mais na busca de Nova conversa (padrão: 0)")
+    parser.add_argument("--atraso-extras", type=float, default=0.0,
+                        help="Atraso (s) dos resultados a mais em relação ao primeiro")
+    args = parser.parse_args(argv)
+
+    servidor = ServidorFalso(args.porta, latencia=args.latencia, atraso_chat=args.atraso_chat,
+                             atraso_busca=args.atraso_busca, atraso_tique=args.atraso_tique,
+                             taxa_invalidos=args.taxa_invalidos, resultados_extras=args.resultados_extras,
+                             atraso_extras=args.atraso_extras)
+    print(f"WhatsApp falso em {servidor.url} (use BITTECH_WHATSAPP_URL={servidor.url})")
+    servidor.servir_para_sempre()
+
+
+if __name__ == "__main__":
+    main()
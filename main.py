@@ -1,8 +1,35 @@
 import flet as ft
-import pandas as pd
+import importlib
+import json
+import os
 import threading
-import datetime
-from web_interactor import execute_numbers
+import time
+from driver_service import DriverService
+from campaign_journal import CampaignJournal, gerar_id_campanha
+from campaign_queue import FilaCampanhas
+from metrics import RegistroMetricas
+from phone_numbers import IndiceTelefones
+from ui_updater import AtualizadorUI, MedidorVazao, formatar_tempo
+from message_template import (HORARIO_COMERCIAL, NOME_TEMPLATE_PADRAO, carregar_templates, compilar_campanha,
+                              saudacao_atual, valores_campanha)
+from send_scheduler import AgendadorEnvio
+from cancellation import PRAZO_ENCERRAMENTO, TokenCancelamento
+from spreadsheet_reader import (EXTENSOES_SUPORTADAS, PlanilhaInvalida, contar_em_segundo_plano,
+                                iterar_contatos, validar_cabecalho)
+
+# Módulos pesados carregados sob demanda, fora da abertura da janela: pandas ao selecionar a
+# planilha (preload_modules) e o Selenium ao enviar (DriverService.obter)
+MODULOS_PLANILHA = ("contact_pipeline", "dry_run")
+
+# Arquivo onde o startup_benchmark.py recebe os marcos da inicialização (ex.: janela pronta)
+MARCADOR_INICIO = os.environ.get("BITTECH_MARCADOR_INICIO")
+
+
+def mark_startup(event):
+    """Registra um marco da inicialização para o startup_benchmark.py, se ele estiver medindo"""
+    if MARCADOR_INICIO:
+        with open(MARCADOR_INICIO, "a", encoding="utf-8") as marker:
+            marker.write(json.dumps({"evento": event, "ts": time.time()}) + "\n")
 
 
 class WhatsAppSenderUI:
@@ -15,19 +42,23 @@ class WhatsAppSenderUI:
         self.page.window.height = 780
         self.page.window.center()
         self.page.window.maximizable = False
+        self.page.scroll = ft.ScrollMode.AUTO  # A prévia completa da campanha pode exceder a janela
+        # Intercepta o fechamento da janela para encerrar o navegador compartilhado
+        self.page.window.prevent_close = True
+        self.page.window.on_event = self.on_window_event
         self.page.update()
 
-        self.df = None
-        self.sender_name = ""
-
-        # Template base com marcadores de gênero e saudação
-        self.message_template = """$SAUDACAO$, *$NOME_PESSOA$*, tudo bem?
-
-Meu nome é *$NOME_REMETENTE$*, sou $GENERO_ESTAGIARIO$ Jurídic$GENERO_O_A$ do *INSTITUTO ABRACE*, somos especializados na defesa do trabalhador, e temos como grande objetivo e propósito, poder dar a oportunidade aos trabalhadores a terem acesso à justiça e aos advogados de forma gratuita, sabemos o quão importante é fornecer esse primeiro atendimento.
+        # Agrupa as atualizações da interface em no máximo 10 quadros por segundo
+        self.ui = AtualizadorUI(self.page)
 
-Nosso contato é referente ao seu vínculo com a empresa *$EMPRESA$*, recebemos muitos formulários e indicações pelo site, e também, do Sindicato, quando há muitas demissões contestadas de certas empresas, e será um grande prazer, poder auxiliar.
+        self.file_path = None
+        self.total_registros = None
+        self.count_thread = None
+        self.sender_name = ""
 
-Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilitar um primeiro contato, e analisarmos se há necessidade de um direcionamento para escritórios trabalhistas e se as diretrizes das convenções coletivas foram respeitadas durante o seu vínculo. Caso tenha interesse, manda um *SIM* que entraremos em contato, muito obrigado e tenha um excelente dia."""
+        # Templates de mensagem (padrão + salvos), compilados uma única vez
+        self.templates, template_errors = carregar_templates()
+        self.message_template = self.templates[NOME_TEMPLATE_PADRAO]
 
         # Componentes da interface
         self.file_picker = ft.FilePicker(on_result=self.on_file_selected)
@@ -54,16 +85,35 @@ Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilit
             "Selecionar Planilha",
             icon=ft.icons.UPLOAD_FILE,
             on_click=lambda _: self.file_picker.pick_files(
-                allowed_extensions=["xlsx"]
+                allowed_extensions=EXTENSOES_SUPORTADAS,
+                allow_multiple=True  # Várias planilhas vão direto para a fila de campanhas
             )
         )
 
+        # Fila de campanhas: planilhas (e abas) enviadas em sequência na mesma sessão do navegador,
+        # cada uma com seu remetente e template, sem repetir telefones entre elas
+        self.queue = FilaCampanhas()
+        self.queue_button = ft.ElevatedButton(
+            "Adicionar à Fila",
+            icon=ft.icons.PLAYLIST_ADD,
+            on_click=self.add_to_queue,
+            disabled=True
+        )
+        self.queue_list = ft.Column(spacing=0, visible=False)
+
         self.file_path_text = ft.Text("Nenhum arquivo selecionado", size=12, color=ft.colors.GREY)
         self.file_stats_text = ft.Text("", size=12, color=ft.colors.BLACK)
 
-        # Inicializar o template com o gênero padrão (feminino)
-        self.update_message_preview_initial()
+        self.template_dropdown = ft.Dropdown(
+            label="Modelo de mensagem",
+            width=300,
+            options=[ft.dropdown.Option(name) for name in self.templates],
+            value=NOME_TEMPLATE_PADRAO,
+            on_change=self.on_template_change,
+            visible=len(self.templates) > 1  # Só aparece se houver templates salvos
+        )
 
+        # Inicializar a prévia com o gênero padrão (feminino)
         self.message_preview = ft.TextField(
             label="Prévia da Mensagem",
             multiline=True,
@@ -71,15 +121,22 @@ Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilit
             max_lines=8,
             read_only=True,
             width=550,
-            value=self.message_template
+            value=self.build_preview_text()
         )
 
         self.progress_bar = ft.ProgressBar(width=300, visible=False)
         self.status_text = ft.Text("", size=12)
+        if template_errors:
+            self.status_text.value = "Templates ignorados: " + "; ".join(template_errors)
+            self.status_text.color = ft.colors.RED
 
         # Adicionando contador para mostrar progresso
         self.progress_counter = ft.Text("0/0", size=14, weight=ft.FontWeight.BOLD)
 
+        # Vazão e tempo restante calculados numa janela móvel dos últimos contatos
+        self.throughput = MedidorVazao()
+        self.throughput_text = ft.Text("", size=12, color=ft.colors.GREY)
+
         self.send_button = ft.ElevatedButton(
             "Enviar Mensagens",
             icon=ft.icons.SEND,
@@ -87,6 +144,46 @@ Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilit
             disabled=True
         )
 
+        # Ritmo dos envios: limite por minuto (vazio = sem limite) e restrição ao horário comercial
+        self.rate_field = ft.TextField(
+            label="Mensagens por minuto",
+            hint_text="Sem limite",
+            width=180,
+            keyboard_type=ft.KeyboardType.NUMBER,
+            input_filter=ft.NumbersOnlyInputFilter()
+        )
+        self.business_hours_checkbox = ft.Checkbox(label="Somente em horário comercial (5h às 18h)", value=False)
+
+        self.pause_button = ft.ElevatedButton(
+            "Pausar",
+            icon=ft.icons.PAUSE,
+            on_click=self.toggle_pause,
+            visible=False
+        )
+
+        # Agendador da campanha em andamento (usado pelo botão de pausa)
+        self.scheduler = None
+
+        # Prévia completa (simulação): renderiza a planilha inteira num cache em disco, sem enviar
+        self.dry_run_button = ft.ElevatedButton(
+            "Gerar Prévia Completa",
+            icon=ft.icons.PREVIEW,
+            on_click=self.start_dry_run,
+            disabled=True
+        )
+        self.preview_summary = ft.Text("", size=12)
+        self.preview_list = ft.ListView(height=180, spacing=0, visible=False)
+        self.preview_page_text = ft.Text("", size=12)
+        self.preview_nav = ft.Row([
+            ft.IconButton(ft.icons.CHEVRON_LEFT, on_click=lambda _: self.show_preview_page(self.preview_page - 1)),
+            self.preview_page_text,
+            ft.IconButton(ft.icons.CHEVRON_RIGHT, on_click=lambda _: self.show_preview_page(self.preview_page + 1)),
+        ], alignment=ft.MainAxisAlignment.CENTER, visible=False)
+
+        # Cache da última prévia gerada, consumido pelo envio se ainda corresponder à campanha
+        self.preview = None
+        self.preview_page = 0
+
         self.cancel_button = ft.ElevatedButton(
             "Cancelar",
             icon=ft.icons.CANCEL,
@@ -95,12 +192,23 @@ Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilit
             visible=False
         )
 
-        # Flag para controlar o cancelamento
-        self.cancel_requested = False
+        # Pedido de cancelamento da campanha em andamento, verificado pelas esperas do envio
+        self.cancel_token = TokenCancelamento()
 
         # Thread para execução em segundo plano
         self.sending_thread = None
 
+        # Sessão do WhatsApp reaproveitada entre campanhas (aberta no primeiro envio)
+        self.driver_service = DriverService()
+
+        # Registro em disco das tentativas, usado para retomar campanhas interrompidas
+        self.journal = CampaignJournal()
+
+        # Tempos por contato em JSONL com rotação; BITTECH_METRICAS_PORTA expõe /metrics localmente
+        self.metrics = RegistroMetricas()
+        if os.environ.get("BITTECH_METRICAS_PORTA"):
+            self.metrics.iniciar_servidor(int(os.environ["BITTECH_METRICAS_PORTA"]))
+
         # Layout da interface
 
         self.page.add(
@@ -110,12 +218,13 @@ Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilit
             ),
             ft.Divider(height=1),
             ft.Container(
-                content=ft.Text("1. Selecione uma planilha com colunas: Nome, Telefone e Empresa", size=14),
+                content=ft.Text("1. Selecione uma planilha (.xlsx ou .csv) com colunas: Nome, Telefone e Empresa", size=14),
                 margin=ft.margin.only(top=5, bottom=5)
             ),
-            ft.Row([self.upload_button], wrap=True),
+            ft.Row([self.upload_button, self.queue_button], wrap=True),
             self.file_path_text,
             self.file_stats_text,
+            self.queue_list,
             ft.Divider(height=1),
             ft.Container(
                 content=ft.Text("2. Digite seu nome (remetente)", size=14),
@@ -144,43 +253,24 @@ Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilit
                 content=ft.Text("3. Prévia da mensagem", size=14),
                 margin=ft.margin.only(top=5, bottom=5)
             ),
+            self.template_dropdown,
             ft.Container(
                 content=self.message_preview,
                 margin=ft.margin.only(bottom=5)
             ),
             ft.Divider(height=1),
-            ft.Row([self.send_button, self.cancel_button]),
-            ft.Row([self.progress_bar, self.progress_counter], alignment=ft.MainAxisAlignment.CENTER),
+            ft.Row([self.rate_field, self.business_hours_checkbox]),
+            ft.Row([self.dry_run_button, self.send_button, self.pause_button, self.cancel_button]),
+            self.preview_summary,
+            self.preview_list,
+            self.preview_nav,
+            ft.Row([self.progress_bar, self.progress_counter, self.throughput_text], alignment=ft.MainAxisAlignment.CENTER),
             self.status_text
         )
 
     def get_time_greeting(self):
         """Retorna a saudação adequada com base na hora atual"""
-        current_hour = datetime.datetime.now().hour
-
-        if 5 <= current_hour < 12:
-            return "Bom dia"
-        elif 12 <= current_hour < 18:
-            return "Boa tarde"
-        else:  # 18-23 e 0-4
-            return "Boa noite"
-
-    def update_message_preview_initial(self):
-        """Inicializa o template de mensagem com base no gênero padrão (feminino) e hora atual"""
-        # Determinar as terminações de gênero apropriadas (feminino por padrão)
-        replacements = {
-            "$GENERO_ESTAGIARIO$": "Estagiária",
-            "$GENERO_O_A$": "a",
-            "$SAUDACAO$": self.get_time_greeting(),
-            "$NOME_REMETENTE$": self.sender_name_field.value or "$NOME_REMETENTE$"  # Mantém o placeholder se vazio
-        }
-
-        # Substituir os marcadores no template
-        message_updated = self.message_template
-        for placeholder, value in replacements.items():
-            message_updated = message_updated.replace(placeholder, value)
-
-        self.message_template = message_updated
+        return saudacao_atual()
 
     def on_sender_name_change(self, e):
         """Método específico para lidar com mudanças no nome do remetente"""
@@ -193,107 +283,166 @@ Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilit
         # Verifica se o formulário está válido
         self.check_form_valid()
 
+    def build_preview_text(self):
+        """Monta a prévia com gênero, saudação e remetente; os dados do contato ficam como marcadores"""
+        values = valores_campanha(self.sender_name_field.value, self.gender_radio.value, self.get_time_greeting())
+        return self.message_template.parcial(values).texto
+
     def update_message_preview(self, e=None):
         """Atualiza a prévia da mensagem com base no gênero selecionado e hora atual"""
-        # Template atualizado com quebras de linha preservadas, mas sem espaços extras
-        base_message = """$SAUDACAO$, *$NOME_PESSOA$*, tudo bem?
-
-Meu nome é *$NOME_REMETENTE$*, sou $GENERO_ESTAGIARIO$ Jurídic$GENERO_O_A$ do *INSTITUTO ABRACE*, somos especializados na defesa do trabalhador, e temos como grande objetivo e propósito, poder dar a oportunidade aos trabalhadores a terem acesso à justiça e aos advogados de forma gratuita, sabemos o quão importante é fornecer esse primeiro atendimento.
-
-Nosso contato é referente ao seu vínculo com a empresa *$EMPRESA$*, recebemos muitos formulários e indicações pelo site, e também, do Sindicato, quando há muitas demissões contestadas de certas empresas, e será um grande prazer, poder auxiliar.
-
-Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilitar um primeiro contato, e analisarmos se há necessidade de um direcionamento para escritórios trabalhistas e se as diretrizes das convenções coletivas foram respeitadas durante o seu vínculo. Caso tenha interesse, manda um *SIM* que entraremos em contato, muito obrigado e tenha um excelente dia."""
-
-        # Obtém o nome do remetente do campo de texto
-        sender_name = self.sender_name_field.value
-
-        # Determinar as terminações de gênero apropriadas
-        if self.gender_radio.value == "M":
-            replacements = {
-                "$GENERO_ESTAGIARIO$": "Estagiário",
-                "$GENERO_O_A$": "o",
-                "$SAUDACAO$": self.get_time_greeting()
-            }
-        else:  # "F" ou vazio (default para feminino)
-            replacements = {
-                "$GENERO_ESTAGIARIO$": "Estagiária",
-                "$GENERO_O_A$": "a",
-                "$SAUDACAO$": self.get_time_greeting()
-            }
-
-        # Substituir os marcadores no template
-        preview_message = base_message
-        for placeholder, value in replacements.items():
-            preview_message = preview_message.replace(placeholder, value)
-
-        # Adicionar o nome do remetente se fornecido
-        if sender_name and sender_name.strip():
-            preview_message = preview_message.replace("$NOME_REMETENTE$", sender_name.strip().title())
-
-        # Atualizar o template e a prévia
-        self.message_template = base_message  # O template original permanece com os marcadores
-        self.message_preview.value = preview_message  # A prévia mostra os placeholders
-        self.page.update()
+        self.message_preview.value = self.build_preview_text()
+        self.ui.solicitar()
+
+    def on_template_change(self, e):
+        """Troca o template usado na prévia e no envio"""
+        self.message_template = self.templates[self.template_dropdown.value]
+        self.update_message_preview()
 
     def check_form_valid(self, e=None):
         """Verifica se o formulário está válido para habilitar o botão de envio"""
-        is_valid = self.df is not None and self.sender_name_field.value and self.sender_name_field.value.strip() != ""
-        self.send_button.disabled = not is_valid
-        self.page.update()
+        is_valid = self.file_path is not None and self.sender_name_field.value and self.sender_name_field.value.strip() != ""
+        self.send_button.disabled = not is_valid and len(self.queue.pendentes) == 0
+        self.dry_run_button.disabled = not is_valid
+        self.queue_button.disabled = not is_valid
+        self.ui.solicitar()
+
+    def add_to_queue(self, e=None, file_paths=None):
+        """
+        Adiciona planilhas à fila com o remetente, o gênero e o template atuais
+
+        Todas as abas com as colunas obrigatórias entram na fila, uma campanha por aba.
+        Sem file_paths, adiciona a planilha selecionada.
+        """
+        file_paths = file_paths or [self.file_path]
+        errors = []
+        for file_path in file_paths:
+            try:
+                self.queue.adicionar_arquivo(file_path, self.message_template, self.sender_name_field.value,
+                                             self.gender_radio.value)
+            except Exception as ex:
+                errors.append(f"{os.path.basename(file_path)}: {str(ex)}")
+
+        if errors:
+            self.status_text.value = "Planilhas não adicionadas à fila: " + "; ".join(errors)
+            self.status_text.color = ft.colors.RED
+        else:
+            self.status_text.value = f"{len(self.queue)} campanha(s) na fila. Clique em Enviar para enviar todas."
+            self.status_text.color = ft.colors.BLUE
+        self.show_queue()
+        self.check_form_valid()
+
+    def remove_from_queue(self, campaign):
+        self.queue.remover(campaign)
+        self.show_queue()
+        self.check_form_valid()
+
+    def show_queue(self):
+        """Lista as campanhas da fila com remetente, template e o resultado das já enviadas"""
+        def tile(campaign):
+            if campaign.resultado is None:
+                details = f"{campaign.remetente} · {campaign.template.nome}"
+            else:
+                details = (f"Enviadas: {campaign.resultado['enviadas']}, Falhas: {campaign.resultado['falhas']}, "
+                           f"Já enviadas antes: {campaign.resultado['puladas']}, "
+                           f"Descartadas: {campaign.resultado['invalidos']} inválidas e "
+                           f"{campaign.resultado['duplicados']} repetidas")
+            return ft.ListTile(
+                dense=True,
+                leading=ft.Icon(ft.icons.CHECK_CIRCLE if campaign.resultado is not None else ft.icons.SCHEDULE,
+                                color=ft.colors.GREEN if campaign.resultado is not None else ft.colors.GREY),
+                title=ft.Text(campaign.nome, size=13),
+                subtitle=ft.Text(details, size=12),
+                trailing=ft.IconButton(ft.icons.DELETE, on_click=lambda _: self.remove_from_queue(campaign),
+                                       disabled=self.sending_thread is not None and self.sending_thread.is_alive()),
+            )
+
+        self.queue_list.controls = [tile(campaign) for campaign in self.queue]
+        self.queue_list.visible = len(self.queue) > 0
+        self.ui.solicitar()
+
+    def preload_modules(self):
+        """Importa pandas e a preparação dos contatos em segundo plano, enquanto o formulário é preenchido"""
+        def load():
+            for module in MODULOS_PLANILHA:
+                try:
+                    importlib.import_module(module)
+                except Exception as ex:  # O erro reaparece (e é exibido) no uso real do módulo
+                    print(f"Erro ao carregar {module}: {ex}")
+
+        threading.Thread(target=load, daemon=True).start()
 
     def on_file_selected(self, e: ft.FilePickerResultEvent):
         if e.files:
+            self.preload_modules()
+
+        if e.files and len(e.files) > 1:
+            # Várias planilhas: entram direto na fila com o remetente e o template atuais
+            if not self.sender_name_field.value or self.sender_name_field.value.strip() == "":
+                self.status_text.value = "Digite o nome do remetente antes de adicionar várias planilhas à fila!"
+                self.status_text.color = ft.colors.RED
+            else:
+                self.add_to_queue(file_paths=[file.path for file in e.files])
+        elif e.files:
             file_path = e.files[0].path
             self.file_path_text.value = f"Arquivo selecionado: {e.files[0].name}"
+            self.file_path_text.color = ft.colors.GREY
 
-            # Carregando o arquivo
+            # Valida apenas o cabeçalho; os registros são lidos sob demanda durante o envio
             try:
-                self.df = pd.read_excel(file_path)
-                self.df.columns = [col.strip().title() for col in self.df.columns]
-                # Verificando se tem as colunas necessárias
-                required_columns = ['Nome', 'Telefone', 'Empresa']
-                if not all(col in self.df.columns for col in required_columns):
-                    self.file_path_text.value = "Erro: A planilha não contém todas as colunas necessárias (Nome, Telefone, Empresa)"
-                    self.file_path_text.color = ft.colors.RED
-                    self.file_stats_text.value = ""
-                    self.df = None  # Reseta o dataframe inválido
-                    self.check_form_valid()  # Verifica o estado do formulário
-                    self.page.update()
-                    return
-
-                # Mostrar estatísticas
-                self.file_stats_text.value = f"Total de registros: {len(self.df)}"
+                validar_cabecalho(file_path)
+                self.file_path = file_path
+                self.total_registros = None
+
+                # Conta os registros em segundo plano para não travar a interface
+                self.file_stats_text.value = "Contando registros..."
                 self.file_stats_text.color = ft.colors.BLACK
+                self.count_thread = contar_em_segundo_plano(
+                    file_path, lambda total, erro=None: self.on_file_counted(file_path, total, erro)
+                )
 
                 # Verifica se o formulário está válido (arquivo e nome do remetente)
                 self.check_form_valid()
+            except PlanilhaInvalida as ex:
+                self.file_path_text.value = f"Erro: {str(ex)}"
+                self.file_path_text.color = ft.colors.RED
+                self.file_stats_text.value = ""
+                self.file_path = None  # Reseta a planilha inválida
+                self.check_form_valid()  # Verifica o estado do formulário
             except Exception as ex:
                 self.file_path_text.value = f"Erro ao ler o arquivo: {str(ex)}"
                 self.file_path_text.color = ft.colors.RED
                 self.file_stats_text.value = ""
-                self.df = None  # Reseta o dataframe em caso de erro
+                self.file_path = None  # Reseta a planilha em caso de erro
                 self.check_form_valid()  # Verifica o estado do formulário
 
         self.page.update()
 
-    def replace_message_placeholders(self, message_template, replacements):
-        personalized_message = message_template
-
-        for placeholder, value in replacements.items():
-            placeholder_tag = f"${placeholder}$"
-            personalized_message = personalized_message.replace(placeholder_tag, str(value))
-
-        return personalized_message
+    def on_file_counted(self, file_path, total, erro=None):
+        """Recebe a contagem de registros feita em segundo plano"""
+        if file_path != self.file_path:
+            return  # Outra planilha foi selecionada enquanto contava
+
+        if erro is not None:
+            self.file_stats_text.value = f"Erro ao ler o arquivo: {str(erro)}"
+            self.file_stats_text.color = ft.colors.RED
+            self.file_path = None  # A planilha não pode ser lida até o fim: o envio fica desabilitado
+            self.check_form_valid()
+        else:
+            self.total_registros = total
+            self.file_stats_text.value = f"Total de registros: {total}"
+            self.file_stats_text.color = ft.colors.BLACK
+        self.page.update()
 
     def start_sending_messages(self, e):
-        """Inicia o processo de envio em uma thread separada"""
-        if self.df is None or len(self.df) == 0:
+        """Inicia o processo de envio em uma thread separada (a fila inteira, se houver campanhas nela)"""
+        use_queue = len(self.queue.pendentes) > 0
+        if not use_queue and (self.file_path is None or self.total_registros == 0):
             self.status_text.value = "Nenhum dado para enviar!"
             self.status_text.color = ft.colors.RED
             self.page.update()
             return
 
-        if not self.sender_name_field.value or self.sender_name_field.value.strip() == "":
+        if not use_queue and (not self.sender_name_field.value or self.sender_name_field.value.strip() == ""):
             self.status_text.value = "Digite o nome do remetente!"
             self.status_text.color = ft.colors.RED
             self.page.update()
@@ -301,113 +450,326 @@ Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilit
 
         # Desativa o botão de enviar e ativa o botão de cancelar
         self.send_button.disabled = True
+        self.dry_run_button.disabled = True
+        self.queue_button.disabled = True
         self.cancel_button.visible = True
         self.cancel_button.disabled = False
         self.progress_bar.value = 0
         self.progress_bar.visible = True
         self.status_text.value = "Preparando para enviar mensagens..."
         self.status_text.color = ft.colors.BLUE
-        self.progress_counter.value = f"0/{len(self.df)}"
-        self.cancel_requested = False
+        self.progress_counter.value = (f"0/{self.total_registros if self.total_registros is not None else '?'}"
+                                       if not use_queue else "0/?")
+        self.throughput.reiniciar()
+        self.throughput_text.value = ""
+        self.cancel_token = TokenCancelamento()
+        self.scheduler = AgendadorEnvio(int(self.rate_field.value) if self.rate_field.value else None,
+                                        HORARIO_COMERCIAL if self.business_hours_checkbox.value else None)
+        self.pause_button.text = "Pausar"
+        self.pause_button.icon = ft.icons.PAUSE
+        self.pause_button.visible = True
         self.page.update()
 
-        # Inicia o envio em uma thread separada
-        self.sending_thread = threading.Thread(target=self.send_messages_thread)
-        self.sending_thread.daemon = True
+        # Inicia o envio em uma thread separada; não é daemon para que o encerramento do
+        # aplicativo aguarde os resultados serem gravados e o navegador ser fechado
+        if use_queue:
+            self.queue.remover_concluidas()  # A lista passa a mostrar só as campanhas deste envio
+        self.sending_thread = threading.Thread(target=self.send_queue_thread if use_queue
+                                               else self.send_messages_thread)
         self.sending_thread.start()
+        if use_queue:
+            self.show_queue()  # Bloqueia a remoção de campanhas durante o envio
 
     def cancel_sending(self, e):
         """Cancela o envio das mensagens"""
-        self.cancel_requested = True
+        self.cancel_token.cancelar()
         self.cancel_button.disabled = True
-        self.status_text.value = "Cancelando... aguarde a finalização do envio atual."
+        self.status_text.value = "Cancelando... a mensagem em andamento é finalizada em alguns segundos."
         self.status_text.color = ft.colors.ORANGE
         self.page.update()
+        threading.Thread(target=self.stop_sending, daemon=True).start()
+
+    def stop_sending(self):
+        """
+        Aguarda a thread de envio atender ao cancelamento
+
+        Se ela não terminar em PRAZO_ENCERRAMENTO segundos (ex.: presa em um comando do
+        navegador), o navegador é fechado à força para liberá-la.
+        """
+        self.cancel_token.cancelar()
+        if self.sending_thread is None:
+            return
+        self.sending_thread.join(PRAZO_ENCERRAMENTO)
+        if self.sending_thread.is_alive():
+            self.driver_service.interromper()
+            self.sending_thread.join(PRAZO_ENCERRAMENTO)
+
+    def toggle_pause(self, e):
+        """Pausa ou retoma os próximos envios; o envio em andamento é concluído normalmente"""
+        if self.scheduler is None:
+            return
+        if self.scheduler.pausado:
+            self.scheduler.retomar()
+            self.pause_button.text = "Pausar"
+            self.pause_button.icon = ft.icons.PAUSE
+        else:
+            self.scheduler.pausar()
+            self.pause_button.text = "Retomar"
+            self.pause_button.icon = ft.icons.PLAY_ARROW
+        self.page.update()
 
     def update_progress(self, atual, total, status, success=True):
-        """Atualiza o progresso na interface usando threading.Timer"""
+        """Agenda a atualização do progresso; chamadas seguidas no mesmo quadro são agrupadas"""
         # Calcula o progresso de 0 a 1
         progress = atual / total if total > 0 else 0
-
-        # Atualiza a UI na thread principal
-        self.progress_bar.value = progress
-        self.progress_counter.value = f"{atual}/{total}"
-        self.status_text.value = status
-        self.status_text.color = ft.colors.GREEN if success else ft.colors.RED
+        self.throughput.registrar(atual)
+        throughput = self.throughput.texto(total - atual)
+
+        def apply():
+            self.progress_bar.value = progress
+            self.progress_counter.value = f"{atual}/{total}"
+            self.throughput_text.value = throughput
+            self.status_text.value = status
+            self.status_text.color = ft.colors.GREEN if success else ft.colors.RED
+
+        self.ui.agendar("progress", apply)
+
+    def campaign_setup(self):
+        """
+        Fixa saudação (no momento da chamada), remetente e gênero no template e identifica a campanha
+
+        A mesma planilha com o mesmo remetente, gênero e template é tratada como a mesma campanha,
+        então um novo envio retoma de onde parou em vez de repetir os contatos.
+
+        Returns:
+            tuple: (template da campanha, id da campanha)
+        """
+        sender_name = self.sender_name_field.value.strip().title()
+        template = compilar_campanha(self.message_template, sender_name, self.gender_radio.value,
+                                     self.get_time_greeting())
+        campanha_id = gerar_id_campanha(self.file_path, sender_name, self.gender_radio.value,
+                                        self.message_template.nome)
+        return template, campanha_id
+
+    def start_dry_run(self, e):
+        """Gera a prévia completa da campanha em segundo plano"""
+        self.dry_run_button.disabled = True
+        self.send_button.disabled = True
+        self.preview_summary.value = "Gerando prévia..."
+        self.preview_summary.color = ft.colors.BLUE
         self.page.update()
+        threading.Thread(target=self.dry_run_thread, daemon=True).start()
+
+    def dry_run_thread(self):
+        """Prepara e renderiza a planilha inteira no cache de prévia, sem abrir o navegador"""
+        from contact_pipeline import STATUS_DUPLICADO, STATUS_INVALIDO, STATUS_VALIDO
+        from dry_run import estimar_duracao, gerar_previa
+
+        try:
+            template, campanha_id = self.campaign_setup()
+
+            def progress(linhas):
+                def apply():
+                    self.preview_summary.value = f"Gerando prévia... {linhas} linhas processadas"
+                self.ui.agendar("preview", apply)
+
+            if self.preview is not None:
+                self.preview.fechar()
+                self.preview = None
+            self.preview = gerar_previa(self.file_path, template, campanha_id, IndiceTelefones(), progress)
+            self.ui.descarregar()
+
+            # Estimativa pela vazão real das últimas tentativas registradas no journal
+            contagem = self.preview.contagem
+            resumo = (f"{contagem[STATUS_VALIDO]} mensagens a enviar · "
+                      f"{contagem[STATUS_INVALIDO]} números inválidos · {contagem[STATUS_DUPLICADO]} repetidos · "
+                      f"{self.preview.total - contagem[STATUS_VALIDO] - contagem[STATUS_INVALIDO] - contagem[STATUS_DUPLICADO]} incompletos")
+            duracao = estimar_duracao(self.preview.validos, self.journal.intervalo_medio(),
+                                      int(self.rate_field.value) if self.rate_field.value else None)
+            resumo += (f" · duração estimada ~{formatar_tempo(duracao)}" if duracao is not None
+                       else " · sem histórico de envios para estimar a duração")
+            self.preview_summary.value = resumo
+            self.preview_summary.color = ft.colors.BLACK
+            self.show_preview_page(0)
+        except Exception as ex:
+            self.ui.descarregar()
+            self.preview_summary.value = f"Erro ao gerar a prévia: {str(ex)}"
+            self.preview_summary.color = ft.colors.RED
+        finally:
+            self.check_form_valid()
+            self.ui.descarregar()
+
+    def show_preview_page(self, numero):
+        """Exibe uma página da prévia; as linhas são lidas do cache sob demanda"""
+        if self.preview is None:
+            return
+        from contact_pipeline import STATUS_VALIDO
+
+        paginas = self.preview.paginas()
+        self.preview_page = max(0, min(numero, paginas - 1))
+
+        def tile(linha):
+            valido = linha["status"] == STATUS_VALIDO
+            return ft.ListTile(
+                dense=True,
+                title=ft.Text(f"{linha['posicao']}. {linha['nome'] or '(sem nome)'}", size=13),
+                subtitle=ft.Text(f"{linha['telefone'] or linha['telefone_original'] or '(sem telefone)'} · {linha['status']}",
+                                 size=12, color=ft.colors.GREEN if valido else ft.colors.RED),
+                on_click=(lambda _, mensagem=linha["mensagem"]: self.show_preview_message(mensagem)) if valido else None,
+            )
+
+        self.preview_list.controls = [tile(linha) for linha in self.preview.pagina(self.preview_page)]
+        self.preview_list.visible = True
+        self.preview_nav.visible = True
+        self.preview_page_text.value = f"Página {self.preview_page + 1} de {paginas}"
+        self.ui.solicitar()
+
+    def show_preview_message(self, mensagem):
+        """Mostra a mensagem renderizada de um contato no campo de prévia"""
+        self.message_preview.value = mensagem
+        self.ui.solicitar()
 
     def send_messages_thread(self):
         """Função que executa o envio das mensagens em uma thread separada"""
         try:
-            # Prepara os contatos e mensagens
-            contatos = []
-
-            # Obtém a saudação atual no momento do envio
-            greeting = self.get_time_greeting()
-
-            # Define os valores de gênero baseado na seleção do rádio
-            if self.gender_radio.value == "M":
-                genero_estagiario = "Estagiário"
-                genero_o_a = "o"
-            else:  # "F" ou vazio (default para feminino)
-                genero_estagiario = "Estagiária"
-                genero_o_a = "a"
-
-            for index, row in self.df.iterrows():
-                if self.cancel_requested:
-                    self.reset_ui_after_sending()
-                    break
-
-                if all(field in row and not pd.isna(row[field]) for field in ['Nome', 'Telefone', 'Empresa']):
-                    nome = row['Nome'].strip().title()
-                    telefone = row['Telefone']
-                    empresa = row['Empresa'].strip().title()
-
-                    replacements = {
-                        "NOME_PESSOA": nome,
-                        "NOME_REMETENTE": self.sender_name_field.value.strip().title(),
-                        "EMPRESA": empresa,
-                        "SAUDACAO": greeting,
-                        "GENERO_ESTAGIARIO": genero_estagiario,
-                        "GENERO_O_A": genero_o_a
-                    }
-
-                    message = self.replace_message_placeholders(self.message_template, replacements)
-
-                    contatos.append({
-                        'nome': nome,
-                        'telefone': telefone,
-                        'mensagem': message
-                    })
-
-            if self.cancel_requested:
-                self.reset_ui_after_sending()
-                return
+            # O navegador abre e autentica enquanto a campanha é preparada e a planilha contada
+            self.driver_service.aquecer(self.cancel_token)
+
+            from contact_pipeline import STATUS_DUPLICADO, STATUS_INVALIDO, montar_contatos
+            from web_interactor import execute_numbers
+
+            template, campanha_id = self.campaign_setup()
+
+            preview = self.preview
+            if (preview is not None and preview.meta["campanha"] == campanha_id
+                    and preview.atual(self.file_path, template)):
+                # A prévia completa ainda corresponde à campanha: envia direto do cache
+                contatos = preview.contatos()
+                total = preview.validos
+                dropped = None
+                invalid_count = preview.contagem[STATUS_INVALIDO]
+                duplicate_count = preview.contagem[STATUS_DUPLICADO]
+            else:
+                # Índice dos telefones já vistos: números inválidos ou repetidos são descartados antes do envio
+                phone_index = IndiceTelefones()
+
+                # O total vem da contagem em segundo plano iniciada ao selecionar o arquivo
+                if self.count_thread is not None:
+                    self.count_thread.join()
+                if self.file_path is None or self.total_registros is None:
+                    raise PlanilhaInvalida("Não foi possível ler a planilha até o fim; selecione-a novamente")
+
+                contatos = montar_contatos(iterar_contatos(self.file_path), template, phone_index,
+                                           lambda: self.cancel_token.cancelado)
+                # As linhas descartadas durante a leitura saem do total à medida que são lidas
+                total = self.total_registros
+                dropped = lambda: phone_index.descartados
+                invalid_count = duplicate_count = None
 
             # Executa o envio das mensagens
-            resultado = execute_numbers(contatos, self.update_progress)
+            resultado = execute_numbers(contatos, self.update_progress, self.driver_service,
+                                        journal=self.journal, campanha_id=campanha_id,
+                                        total=total, metricas=self.metrics,
+                                        agendador=self.scheduler, cancelamento=self.cancel_token,
+                                        descartados=dropped)
+            if invalid_count is None:
+                invalid_count, duplicate_count = phone_index.invalidos, phone_index.duplicados
+
+            # Aplica o último progresso pendente antes de mostrar o resultado final
+            self.ui.descarregar()
+
+            if resultado["cancelado"]:
+                self.status_text.value = (f"Envio cancelado. Enviadas: {resultado['enviadas']}, "
+                                          f"Falhas: {resultado['falhas']}, Já enviadas antes: {resultado['puladas']}")
+                self.status_text.color = ft.colors.ORANGE
+                self.reset_ui_after_sending()
+                return
 
             # Atualiza a interface com o resultado final
-            self.status_text.value = f"Envio concluído! Enviadas: {resultado['enviadas']}, Falhas: {resultado['falhas']}"
+            self.status_text.value = (f"Envio concluído! Enviadas: {resultado['enviadas']}, Falhas: {resultado['falhas']}, "
+                                      f"Já enviadas antes: {resultado['puladas']}, "
+                                      f"Descartadas: {invalid_count} inválidas e {duplicate_count} repetidas")
             self.status_text.color = ft.colors.GREEN
             self.reset_ui_after_sending()
 
         except Exception as ex:
+            self.ui.descarregar()
             self.status_text.value = f"Erro durante o envio: {str(ex)}"
             self.status_text.color = ft.colors.RED
             self.reset_ui_after_sending()
 
+    def send_queue_thread(self):
+        """Envia as campanhas da fila em sequência, na mesma sessão do navegador"""
+        try:
+            self.driver_service.aquecer(self.cancel_token)
+
+            from web_interactor import execute_numbers
+
+            def send(contatos, campanha_id, total, dropped):
+                return execute_numbers(contatos, self.update_progress, self.driver_service,
+                                       journal=self.journal, campanha_id=campanha_id,
+                                       total=total, metricas=self.metrics,
+                                       agendador=self.scheduler, cancelamento=self.cancel_token,
+                                       descartados=dropped)
+
+            def started(position, campaign, total):
+                self.throughput.reiniciar()
+                self.update_progress(0, total, f"Campanha {position}/{pending}: {campaign.nome}")
+
+            pending = len(self.queue.pendentes)
+
+            sent = self.queue.executar(send, self.cancel_token, started, lambda *_: self.show_queue())
+            self.ui.descarregar()
+
+            sent_count = sum(campaign.resultado["enviadas"] for campaign in sent)
+            failed_count = sum(campaign.resultado["falhas"] for campaign in sent)
+            if self.cancel_token.cancelado:
+                self.status_text.value = (f"Envio da fila cancelado. Enviadas: {sent_count}, Falhas: {failed_count}. "
+                                          f"As campanhas não concluídas continuam na fila.")
+                self.status_text.color = ft.colors.ORANGE
+            else:
+                self.status_text.value = (f"Fila concluída! {len(sent)} campanha(s), Enviadas: {sent_count}, "
+                                          f"Falhas: {failed_count}")
+                self.status_text.color = ft.colors.GREEN
+
+            # As concluídas ficam na lista com o resultado até o próximo envio da fila; a interrompida
+            # continua pendente e retoma de onde parou pelo journal
+            self.reset_ui_after_sending()
+            self.show_queue()
+
+        except Exception as ex:
+            self.ui.descarregar()
+            self.status_text.value = f"Erro durante o envio da fila: {str(ex)}"
+            self.status_text.color = ft.colors.RED
+            self.reset_ui_after_sending()
+            self.show_queue()
+
     def reset_ui_after_sending(self):
         """Reset da UI após o envio"""
         self.send_button.disabled = False
         self.cancel_button.visible = False
+        self.pause_button.visible = False
         self.progress_bar.visible = False
         self.check_form_valid()  # Verifica novamente após concluir operação
-        self.page.update()
+        self.ui.descarregar()  # Garante que o estado final seja exibido
+
+    def on_window_event(self, e):
+        """Encerra o navegador compartilhado somente quando o aplicativo é fechado"""
+        if e.data == "close":
+            # Um envio em andamento é cancelado e tem um prazo para gravar os resultados
+            if self.sending_thread is not None and self.sending_thread.is_alive():
+                self.stop_sending()
+            self.driver_service.encerrar()
+            self.journal.fechar()
+            self.metrics.fechar()
+            if self.preview is not None:
+                self.preview.fechar()
+            self.page.window.destroy()
 
 
 def main(page: ft.Page):
     app = WhatsAppSenderUI(page)
+    mark_startup("janela")
 
 
 # Executar a aplicação
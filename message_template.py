@@ -0,0 +1,161 @@
+import datetime
+import re
+from pathlib import Path
+from config import diretorio_dados
+
+# Marcadores aceitos nos templates, no formato $NOME$
+MARCADORES = (
+    "SAUDACAO",
+    "NOME_PESSOA",
+    "NOME_REMETENTE",
+    "GENERO_ESTAGIARIO",
+    "GENERO_O_A",
+    "EMPRESA",
+)
+# Marcadores preenchidos com os dados de cada contato da planilha
+MARCADORES_CONTATO = ("NOME_PESSOA", "EMPRESA")
+PADRAO_MARCADOR = re.compile(r"\$([A-Z][A-Z0-9_]*)\$")
+
+NOME_TEMPLATE_PADRAO = "Padrão"
+
+# Template base com marcadores de gênero e saudação
+TEMPLATE_PADRAO = """$SAUDACAO$, *$NOME_PESSOA$*, tudo bem?
+
+Meu nome é *$NOME_REMETENTE$*, sou $GENERO_ESTAGIARIO$ Jurídic$GENERO_O_A$ do *INSTITUTO ABRACE*, somos especializados na defesa do trabalhador, e temos como grande objetivo e propósito, poder dar a oportunidade aos trabalhadores a terem acesso à justiça e aos advogados de forma gratuita, sabemos o quão importante é fornecer esse primeiro atendimento.
+
+Nosso contato é referente ao seu vínculo com a empresa *$EMPRESA$*, recebemos muitos formulários e indicações pelo site, e também, do Sindicato, quando há muitas demissões contestadas de certas empresas, e será um grande prazer, poder auxiliar.
+
+Lembrando que é de forma *COMPLETAMENTE GRATUITA*, seria apenas para possibilitar um primeiro contato, e analisarmos se há necessidade de um direcionamento para escritórios trabalhistas e se as diretrizes das convenções coletivas foram respeitadas durante o seu vínculo. Caso tenha interesse, manda um *SIM* que entraremos em contato, muito obrigado e tenha um excelente dia."""
+
+
+class TemplateInvalido(Exception):
+    """Template com marcadores desconhecidos ou valores ausentes na renderização"""
+
+
+# Períodos do dia (hora inicial inclusiva, hora final exclusiva) de cada saudação; também usados
+# pelo agendador de envios para restringir os disparos a certos períodos
+PERIODOS_SAUDACAO = {
+    "Bom dia": (5, 12),
+    "Boa tarde": (12, 18),
+    "Boa noite": (18, 5),  # 18-23 e 0-4
+}
+HORARIO_COMERCIAL = ("Bom dia", "Boa tarde")
+
+
+def saudacao_atual(hora=None):
+    """Retorna a saudação adequada com base na hora (por padrão, a hora atual)"""
+    if hora is None:
+        hora = datetime.datetime.now().hour
+
+    for saudacao, (inicio, fim) in PERIODOS_SAUDACAO.items():
+        if inicio <= hora < fim or (inicio > fim and (hora >= inicio or hora < fim)):
+            return saudacao
+
+
+def valores_campanha(remetente, genero, saudacao=None):
+    """Valores dos marcadores que são iguais para todos os contatos de uma campanha"""
+    valores = {
+        "SAUDACAO": saudacao or saudacao_atual(),
+        "GENERO_ESTAGIARIO": "Estagiário" if genero == "M" else "Estagiária",
+        "GENERO_O_A": "o" if genero == "M" else "a",  # "F" ou vazio (default para feminino)
+    }
+    if remetente and remetente.strip():
+        valores["NOME_REMETENTE"] = remetente.strip().title()
+    return valores
+
+
+class MessageTemplate:
+    """
+    Template compilado uma única vez em trechos fixos e marcadores
+
+    A renderização percorre os trechos e faz um único join, sem varrer o texto a cada marcador.
+    """
+
+    def __init__(self, texto, nome=None):
+        self.texto = texto
+        self.nome = nome
+        self.segmentos = []  # Pares (trecho fixo, marcador ou None)
+
+        inicio = 0
+        for encontrado in PADRAO_MARCADOR.finditer(texto):
+            marcador = encontrado.group(1)
+            if marcador not in MARCADORES:
+                raise TemplateInvalido(f"Marcador desconhecido no template: ${marcador}$")
+            self.segmentos.append((texto[inicio:encontrado.start()], marcador))
+            inicio = encontrado.end()
+        self.segmentos.append((texto[inicio:], None))
+
+        self.marcadores = {marcador for _, marcador in self.segmentos if marcador}
+
+    def renderizar(self, valores):
+        """
+        Monta a mensagem final
+
+        Raises:
+            TemplateInvalido: Se faltar o valor de algum marcador do template
+        """
+        faltando = self.marcadores.difference(valores)
+        if faltando:
+            raise TemplateInvalido(f"Valores ausentes para os marcadores: {', '.join(sorted(faltando))}")
+
+        partes = []
+        for trecho, marcador in self.segmentos:
+            partes.append(trecho)
+            if marcador:
+                partes.append(str(valores[marcador]))
+        return "".join(partes)
+
+    def parcial(self, valores):
+        """
+        Retorna um novo template com os marcadores informados já substituídos
+
+        Usado para fixar os valores da campanha uma vez, deixando apenas os marcadores de
+        cada contato; na prévia, os marcadores sem valor continuam visíveis como $NOME$.
+        """
+        partes = []
+        for trecho, marcador in self.segmentos:
+            partes.append(trecho)
+            if marcador:
+                partes.append(str(valores[marcador]) if marcador in valores else f"${marcador}$")
+        return MessageTemplate("".join(partes), self.nome)
+
+
+def compilar_campanha(template, remetente, genero, saudacao=None):
+    """
+    Fixa os valores da campanha no template, restando apenas os marcadores de cada contato
+
+    Raises:
+        TemplateInvalido: Se algum marcador não puder ser preenchido (ex.: remetente vazio)
+    """
+    compilado = template.parcial(valores_campanha(remetente, genero, saudacao))
+    faltando = compilado.marcadores.difference(MARCADORES_CONTATO)
+    if faltando:
+        raise TemplateInvalido(f"Valores ausentes para os marcadores: {', '.join(sorted(faltando))}")
+    return compilado
+
+
+def diretorio_templates():
+    return diretorio_dados("templates")
+
+
+def carregar_templates():
+    """
+    Carrega o template padrão e os templates salvos (.txt no diretório de templates)
+
+    Returns:
+        tuple: (dict nome -> MessageTemplate, lista de mensagens de erro dos arquivos inválidos)
+    """
+    templates = {NOME_TEMPLATE_PADRAO: MessageTemplate(TEMPLATE_PADRAO, NOME_TEMPLATE_PADRAO)}
+    erros = []
+    for arquivo in sorted(diretorio_templates().glob("*.txt")):
+        try:
+            templates[arquivo.stem] = carregar_template(arquivo)
+        except (OSError, UnicodeDecodeError, TemplateInvalido) as e:
+            erros.append(f"{arquivo.name}: {e}")
+    return templates, erros
+
+
+def carregar_template(caminho):
+    """Lê e compila um template a partir de um arquivo de texto"""
+    caminho = Path(caminho)
+    return MessageTemplate(caminho.read_text(encoding="utf-8"), caminho.stem)
@@ -0,0 +1,151 @@
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from config import diretorio_dados
+
+ARQUIVO_METRICAS = "metricas.jsonl"
+PERCENTIS = (0.5, 0.95, 0.99)
+
+
+def percentil(valores_ordenados, p):
+    """Percentil pelo método do posto mais próximo"""
+    if not valores_ordenados:
+        return None
+    indice = max(0, min(len(valores_ordenados) - 1, math.ceil(p * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+class RegistroMetricas:
+    """
+    Registra a duração de cada fase e o resultado de cada contato
+
+    Os eventos são gravados em um arquivo JSONL com rotação; as últimas `janela` durações de
+    cada fase ficam em memória para os resumos p50/p95/p99 e para o endpoint no formato Prometheus.
+    """
+
+    def __init__(self, diretorio=None, max_bytes=5 * 1024 * 1024, backups=5, janela=5000):
+        self.caminho = (diretorio or diretorio_dados("metricas")) / ARQUIVO_METRICAS
+        self._lock = threading.Lock()
+        self._duracoes = defaultdict(lambda: deque(maxlen=janela))
+        self._somas = Counter()
+        self._contagens = Counter()
+        self._resultados = Counter()
+        self._servidor = None
+
+        self._logger = logging.getLogger(f"bittech.metricas.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._handler = RotatingFileHandler(self.caminho, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(self._handler)
+
+    def _gravar(self, tipo, **dados):
+        self._logger.info(json.dumps({"tipo": tipo, "ts": round(time.time(), 3), **dados}, ensure_ascii=False))
+
+    def observar(self, fase, duracao):
+        """Acrescenta uma duração (em segundos) às estatísticas da fase"""
+        with self._lock:
+            self._duracoes[fase].append(duracao)
+            self._somas[fase] += duracao
+            self._contagens[fase] += 1
+
+    @contextmanager
+    def cronometrar(self, fase, **dados):
+        """Mede o bloco, registra a duração na fase e grava um evento com os dados extras"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = round(time.perf_counter() - inicio, 3)
+            self.observar(fase, duracao)
+            self._gravar(fase, duracao=duracao, **dados)
+
+    def registrar_contato(self, campanha, telefone, resultado):
+        """Registra as fases, o resultado e o motivo de falha de um envio (retorno de enviar_mensagem)"""
+        motivo = resultado["motivo"].value if resultado.get("motivo") else None
+        for fase, duracao in resultado["tempos"].items():
+            self.observar(f"contato_{fase}", duracao)
+        with self._lock:
+            self._resultados[resultado["status"] if resultado["sucesso"] else motivo] += 1
+        self._gravar("contato", campanha=campanha, telefone=telefone, sucesso=resultado["sucesso"],
+                     motivo=motivo, navegacao=resultado.get("navegacao"), tempos=resultado["tempos"])
+
+    def registrar_campanha(self, campanha, estatisticas):
+        """Grava o resultado da campanha junto com o resumo das durações"""
+        self._gravar("resumo_campanha", campanha=campanha, estatisticas=estatisticas, percentis=self.resumo())
+
+    def percentis(self, fase):
+        with self._lock:
+            valores = sorted(self._duracoes.get(fase, ()))
+        resumo = {f"p{int(p * 100)}": percentil(valores, p) for p in PERCENTIS}
+        resumo["n"] = len(valores)
+        return resumo
+
+    def resumo(self):
+        """Retorna {fase: {'p50', 'p95', 'p99', 'n'}} das durações em memória"""
+        with self._lock:
+            fases = list(self._duracoes)
+        return {fase: self.percentis(fase) for fase in fases}
+
+    def texto_prometheus(self):
+        """Exporta as métricas no formato de texto do Prometheus"""
+        linhas = [
+            "# HELP bittech_duracao_segundos Duração das fases do envio",
+            "# TYPE bittech_duracao_segundos summary",
+        ]
+        with self._lock:
+            fases = {fase: sorted(valores) for fase, valores in self._duracoes.items()}
+            somas = dict(self._somas)
+            contagens = dict(self._contagens)
+            resultados = dict(self._resultados)
+
+        for fase, valores in fases.items():
+            for p in PERCENTIS:
+                linhas.append(f'bittech_duracao_segundos{{fase="{fase}",quantile="{p}"}} {percentil(valores, p)}')
+            linhas.append(f'bittech_duracao_segundos_sum{{fase="{fase}"}} {somas[fase]:.3f}')
+            linhas.append(f'bittech_duracao_segundos_count{{fase="{fase}"}} {contagens[fase]}')
+
+        linhas.append("# HELP bittech_envios_total Contatos processados por resultado")
+        linhas.append("# TYPE bittech_envios_total counter")
+        for resultado, quantidade in resultados.items():
+            linhas.append(f'bittech_envios_total{{resultado="{resultado}"}} {quantidade}')
+        return "\n".join(linhas) + "\n"
+
+    def iniciar_servidor(self, porta=9464, host="127.0.0.1"):
+        """Expõe /metrics em um servidor HTTP local (thread em segundo plano)"""
+        # Importado só quando a exposição é pedida: http.server pesa na abertura do aplicativo
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registro = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                corpo = registro.texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((host, porta), Handler)
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self._servidor
+
+    def fechar(self):
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
@@ -0,0 +1,132 @@
+import re
+
+# DDDs em uso no Brasil (Anatel)
+DDDS_VALIDOS = (
+    "11", "12", "13", "14", "15", "16", "17", "18", "19",
+    "21", "22", "24", "27", "28",
+    "31", "32", "33", "34", "35", "37", "38",
+    "41", "42", "43", "44", "45", "46", "47", "48", "49",
+    "51", "53", "54", "55",
+    "61", "62", "63", "64", "65", "66", "67", "68", "69",
+    "71", "73", "74", "75", "77", "79",
+    "81", "82", "83", "84", "85", "86", "87", "88", "89",
+    "91", "92", "93", "94", "95", "96", "97", "98", "99",
+)
+
+# Número nacional, aceitando prefixo de longa distância (0 + operadora) e o código do país 55:
+# celular com 9 dígitos (9XXXXXXXX), fixo com 8 (2-5) ou celular antigo sem o nono dígito (6-9)
+PADRAO_NACIONAL = (
+    r"(?:0(?:\d{2})?)?(?:55)?"
+    r"(?P<ddd>" + "|".join(DDDS_VALIDOS) + r")"
+    r"(?P<numero>9\d{8}|[2-9]\d{7})"
+)
+REGEX_NACIONAL = re.compile(PADRAO_NACIONAL)
+
+# Números de outros países, quando informados explicitamente com + ou 00
+REGEX_INTERNACIONAL = re.compile(r"\s*(?:\+|00)")
+TAMANHO_E164 = (8, 15)
+REGEX_NAO_DIGITOS = re.compile(r"\D")
+REGEX_CHAVE = re.compile(r"\+\d{8,15}")
+
+
+def _chave_nacional(ddd, numero):
+    # Celulares antigos de 8 dígitos recebem o nono dígito
+    if len(numero) == 8 and numero[0] in "6789":
+        numero = "9" + numero
+    return f"+55{ddd}{numero}"
+
+
+def normalizar_telefone(valor):
+    """
+    Valida um telefone e retorna sua chave canônica no formato E.164 (ex.: +5511912345678)
+
+    Returns:
+        str: Chave canônica, ou None se o número for inválido
+    """
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    if texto.endswith(".0"):  # Números lidos como float pelo Excel
+        texto = texto[:-2]
+    digitos = REGEX_NAO_DIGITOS.sub("", texto)
+
+    internacional = REGEX_INTERNACIONAL.match(texto)
+    if internacional and texto.lstrip().startswith("00"):
+        digitos = digitos[2:]
+    if internacional and not digitos.startswith("55"):
+        minimo, maximo = TAMANHO_E164
+        return f"+{digitos}" if minimo <= len(digitos) <= maximo else None
+
+    encontrado = REGEX_NACIONAL.fullmatch(digitos)
+    if not encontrado:
+        return None
+    return _chave_nacional(encontrado.group("ddd"), encontrado.group("numero"))
+
+
+def eh_chave_canonica(valor):
+    """Indica se o valor já é uma chave E.164 produzida por normalizar_telefone"""
+    return isinstance(valor, str) and REGEX_CHAVE.fullmatch(valor) is not None
+
+
+def normalizar_serie(telefones):
+    """
+    Aplica normalizar_telefone a uma coluna do pandas (inválidos viram <NA>)
+
+    As operações .str do pandas percorrem os valores em Python de qualquer forma; uma única
+    passada com as expressões já compiladas é mais rápida que encadear várias delas.
+    """
+    return telefones.map(normalizar_telefone, na_action="ignore").astype("string")
+
+
+class IndiceTelefones:
+    """
+    Índice de chaves canônicas já vistas, usado para descartar números repetidos
+
+    Também contabiliza quantas linhas foram descartadas por terem campos vazios ou números
+    inválidos ou duplicados.
+    """
+
+    def __init__(self):
+        self._chaves = set()
+        self.incompletos = 0
+        self.invalidos = 0
+        self.duplicados = 0
+
+    @property
+    def descartados(self):
+        """Total de linhas descartadas até agora"""
+        return self.incompletos + self.invalidos + self.duplicados
+
+    def __contains__(self, chave):
+        return chave in self._chaves
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def copia(self):
+        """Novo índice com as mesmas chaves e os contadores zerados"""
+        indice = IndiceTelefones()
+        indice._chaves = set(self._chaves)
+        return indice
+
+    def adicionar(self, chave):
+        """Registra a chave; retorna False (e conta como duplicado) se ela já existia"""
+        if chave in self._chaves:
+            self.duplicados += 1
+            return False
+        self._chaves.add(chave)
+        return True
+
+    def filtrar_novos(self, chaves):
+        """
+        Versão em lote de adicionar para uma coluna do pandas
+
+        Returns:
+            pd.Series: Máscara booleana com True nas chaves vistas pela primeira vez
+        """
+        novos = ~chaves.duplicated()
+        if self._chaves:
+            novos &= ~chaves.isin(self._chaves)
+        self.duplicados += int((~novos).sum())
+        self._chaves.update(chaves[novos].tolist())
+        return novos
@@ -0,0 +1,87 @@
+import heapq
+import itertools
+import time
+from wait_engine import MotivoFalha
+
+# Falhas que podem dar certo numa nova tentativa (página lenta, clique recusado, erro do navegador);
+# todas acontecem antes do clique em enviar, então nenhuma mensagem saiu
+MOTIVOS_TRANSITORIOS = frozenset({
+    MotivoFalha.TIMEOUT_CARREGAMENTO,
+    MotivoFalha.FALHA_CLIQUE,
+    MotivoFalha.ERRO,
+})
+
+# Nunca repetidas: número inválido ou sem conta não muda, e qualquer falha depois do clique
+# (NAO_CONFIRMADO) pode ter deixado a mensagem saindo, então repeti-la arriscaria envio duplicado
+MOTIVOS_PERMANENTES = frozenset({
+    MotivoFalha.NUMERO_INVALIDO,
+    MotivoFalha.NAO_REGISTRADO,
+    MotivoFalha.NAO_CONFIRMADO,
+})
+
+# Intervalo máximo de cada espera, para atender ao cancelamento com frequência
+ESPERA_MAXIMA = 0.5
+
+
+def falha_transitoria(motivo):
+    """Indica se vale a pena tentar novamente um envio que falhou com este motivo"""
+    return motivo in MOTIVOS_TRANSITORIOS
+
+
+class FilaRetentativas:
+    """
+    Fila dos contatos cujo envio falhou por um motivo transitório
+
+    Os contatos são tentados novamente ao final da campanha, depois de uma espera que
+    dobra a cada tentativa (espera_base, 2x, 4x... até espera_maxima).
+
+    Args:
+        max_tentativas: Total de tentativas por contato, incluindo a primeira (1 = sem retentativas)
+        espera_base: Espera (s) antes da segunda tentativa
+        espera_maxima: Limite (s) da espera entre tentativas
+    """
+
+    def __init__(self, max_tentativas=3, espera_base=5, espera_maxima=60):
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self._fila = []  # Heap de (disponível em, ordem, tentativa, contato)
+        self._ordem = itertools.count()
+
+    def __len__(self):
+        return len(self._fila)
+
+    def espera(self, tentativa):
+        """Espera (s) antes da tentativa seguinte à de número `tentativa`"""
+        return min(self.espera_base * 2 ** (tentativa - 1), self.espera_maxima)
+
+    def adicionar(self, contato, motivo, tentativa=1):
+        """
+        Agenda uma nova tentativa se a falha for transitória e ainda houver tentativas
+
+        Returns:
+            bool: True se o contato foi agendado (a falha ainda não é definitiva)
+        """
+        if not falha_transitoria(motivo) or tentativa >= self.max_tentativas:
+            return False
+        disponivel_em = time.monotonic() + self.espera(tentativa)
+        heapq.heappush(self._fila, (disponivel_em, next(self._ordem), tentativa + 1, contato))
+        return True
+
+    def proximo(self, deve_parar=None):
+        """
+        Aguarda a espera do próximo contato terminar e o retira da fila
+
+        Returns:
+            tuple | None: (contato, número da tentativa), ou None se a fila estiver vazia
+                ou deve_parar retornar True durante a espera
+        """
+        while self._fila:
+            if deve_parar and deve_parar():
+                return None
+            restante = self._fila[0][0] - time.monotonic()
+            if restante <= 0:
+                _, _, tentativa, contato = heapq.heappop(self._fila)
+                return contato, tentativa
+            time.sleep(min(restante, ESPERA_MAXIMA))
+        return None
@@ -0,0 +1,122 @@
+import datetime
+import threading
+import time
+from message_template import PERIODOS_SAUDACAO, saudacao_atual
+
+# Intervalo máximo de cada espera, para reavaliar pausa, janela e interrupção com frequência
+ESPERA_MAXIMA = 0.5
+
+
+class AgendadorEnvio:
+    """
+    Balde de fichas que decide quando o próximo envio pode começar
+
+    O laço de envio só pergunta "quando posso enviar?" (aguardar); ritmo, horário permitido e
+    pausa ficam concentrados aqui. Com rajada=1 os envios ficam espaçados de forma regular, sem
+    sorteio de atrasos: um envio demorado não é seguido de uma rajada para "compensar".
+
+    Args:
+        mensagens_por_minuto: Limite de envios por minuto (None ou 0 = sem limite)
+        periodos: Saudações (ver PERIODOS_SAUDACAO) em que o envio é permitido, por exemplo
+            HORARIO_COMERCIAL. None permite enviar a qualquer hora
+        rajada: Quantidade de envios que podem ser feitos em sequência após um período ocioso
+    """
+
+    def __init__(self, mensagens_por_minuto=None, periodos=None, rajada=1):
+        if periodos is not None:
+            desconhecidos = set(periodos) - set(PERIODOS_SAUDACAO)
+            if desconhecidos:
+                raise ValueError(f"Períodos desconhecidos: {', '.join(sorted(desconhecidos))}")
+        self.intervalo = 60 / mensagens_por_minuto if mensagens_por_minuto else 0
+        self.periodos = tuple(periodos) if periodos else None
+        self.rajada = max(1, rajada)
+        self._fichas = float(self.rajada)
+        self._atualizado = time.monotonic()
+        self._pausado = False
+        self._condicao = threading.Condition()
+
+    @property
+    def pausado(self):
+        return self._pausado
+
+    def pausar(self):
+        """Suspende os próximos envios (o envio em andamento não é interrompido)"""
+        with self._condicao:
+            self._pausado = True
+            self._condicao.notify_all()
+
+    def retomar(self):
+        """Libera os envios; o ritmo recomeça do zero, sem rajada acumulada durante a pausa"""
+        with self._condicao:
+            self._pausado = False
+            self._fichas = min(self._fichas, 1.0)
+            self._atualizado = time.monotonic()
+            self._condicao.notify_all()
+
+    def _repor(self, agora):
+        if self.intervalo:
+            self._fichas = min(self.rajada, self._fichas + (agora - self._atualizado) / self.intervalo)
+        else:
+            self._fichas = float(self.rajada)
+        self._atualizado = agora
+
+    def abertura_janela(self, agora=None):
+        """Retorna o datetime em que a janela de envio abre, ou None se já estiver aberta"""
+        agora = agora or datetime.datetime.now()
+        if self.periodos is None or saudacao_atual(agora.hour) in self.periodos:
+            return None
+        hora_cheia = agora.replace(minute=0, second=0, microsecond=0)
+        for horas in range(1, 25):
+            candidato = hora_cheia + datetime.timedelta(hours=horas)
+            if saudacao_atual(candidato.hour) in self.periodos:
+                return candidato
+        return None
+
+    def espera(self):
+        """
+        Segundos até o próximo envio poder começar
+
+        Returns:
+            float | None: 0 quando já é possível enviar, ou None enquanto estiver pausado
+        """
+        with self._condicao:
+            if self._pausado:
+                return None
+            abertura = self.abertura_janela()
+            if abertura is not None:
+                return max(0.0, (abertura - datetime.datetime.now()).total_seconds())
+            self._repor(time.monotonic())
+            return 0.0 if self._fichas >= 1 else (1 - self._fichas) * self.intervalo
+
+    def aguardar(self, deve_parar=None, ao_esperar=None):
+        """
+        Bloqueia até o próximo envio ser permitido e consome uma ficha
+
+        Args:
+            deve_parar: Função sem argumentos; quando retorna True a espera é abandonada
+            ao_esperar: Função chamada com uma descrição sempre que a espera passa a ser por
+                pausa ou fora do horário (não é chamada no espaçamento normal entre envios)
+
+        Returns:
+            bool: True se o envio pode começar, False se deve_parar interrompeu a espera
+        """
+        motivo_anterior = None
+        while True:
+            if deve_parar and deve_parar():
+                return False
+            with self._condicao:
+                espera = self.espera()
+                if espera == 0:
+                    self._fichas -= 1
+                    return True
+
+                if espera is None:
+                    motivo = "Envio pausado"
+                else:
+                    abertura = self.abertura_janela()
+                    motivo = f"Fora do horário de envio, retomando às {abertura:%H:%M}" if abertura else None
+                if motivo and motivo != motivo_anterior and ao_esperar:
+                    ao_esperar(motivo)
+                motivo_anterior = motivo
+
+                self._condicao.wait(ESPERA_MAXIMA if espera is None else min(espera, ESPERA_MAXIMA))
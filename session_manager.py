@@ -0,0 +1,151 @@
+import json
+import os
+import shutil
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.firefox.service import Service
+from selenium.common.exceptions import TimeoutException
+from webdriver_manager.firefox import GeckoDriverManager
+from config import DIRETORIO_DADOS, PERFIL_PADRAO, diretorio_dados
+from wait_engine import aguardar
+
+# BITTECH_WHATSAPP_URL permite apontar para o servidor falso local (fake_whatsapp.py) nos benchmarks
+URL_WHATSAPP = os.environ.get("BITTECH_WHATSAPP_URL", "https://web.whatsapp.com/").rstrip("/") + "/"
+
+# Cache do caminho do geckodriver, para evitar a consulta de rede a cada abertura
+ARQUIVO_CACHE_DRIVER = "geckodriver.json"
+
+CSS_PAINEL_LATERAL = "#side"
+CSS_QRCODE = "div[data-ref], canvas[aria-label]"
+
+# Limite para driver.get não travar o envio (nem o cancelamento) indefinidamente
+TIMEOUT_CARREGAMENTO_PAGINA = 60
+
+# Tamanho da janela: o layout de duas colunas do WhatsApp Web (#side + #main) precisa de largura
+LARGURA_JANELA = 1280
+ALTURA_JANELA = 900
+
+# Preferências do Firefox para campanhas longas em máquinas modestas: sem imagens nem mídia,
+# poucos processos de conteúdo, cache só em memória e com limite, sem tarefas de fundo
+PREFERENCIAS_ECONOMIA = {
+    "permissions.default.image": 2,              # Não carrega imagens (fotos de perfil, miniaturas)
+    "media.autoplay.default": 5,                 # Bloqueia reprodução automática de áudio e vídeo
+    "media.autoplay.blocking_policy": 2,
+    "media.preload.default": 0,
+    "media.preload.auto": 0,
+    "dom.ipc.processCount": 1,                   # Um único processo de conteúdo
+    "dom.ipc.processCount.webIsolated": 1,
+    "fission.autostart": False,
+    "browser.cache.disk.enable": False,
+    "browser.cache.memory.capacity": 65536,      # Cache em memória limitado a 64 MB
+    "browser.sessionhistory.max_entries": 5,
+    "browser.sessionhistory.max_total_viewers": 0,
+    "browser.sessionstore.resume_from_crash": False,
+    "browser.tabs.unloadOnLowMemory": True,
+    "toolkit.cosmeticAnimations.enabled": False,
+    "app.update.auto": False,
+    "app.update.enabled": False,
+    "extensions.update.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+}
+
+
+def caminho_perfil(nome=PERFIL_PADRAO):
+    """Retorna o diretório persistente do perfil do Firefox com o nome informado"""
+    return diretorio_dados("perfis", nome)
+
+
+def obter_geckodriver():
+    """Retorna o caminho do geckodriver, usando o cache local sempre que possível"""
+    arquivo_cache = DIRETORIO_DADOS / ARQUIVO_CACHE_DRIVER
+    try:
+        caminho = json.loads(arquivo_cache.read_text(encoding="utf-8"))["caminho"]
+        if os.path.isfile(caminho):
+            return caminho
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # Cache ausente ou inválido: procura no PATH antes de recorrer ao download
+    caminho = shutil.which("geckodriver") or GeckoDriverManager().install()
+    diretorio_dados()
+    arquivo_cache.write_text(json.dumps({"caminho": caminho}), encoding="utf-8")
+    return caminho
+
+
+def opcoes_navegador(economia=True):
+    """Opções do Firefox usadas pelo disparador (tamanho da janela e, opcionalmente, modo economia)"""
+    opcoes = Options()
+    opcoes.add_argument("-width")
+    opcoes.add_argument(str(LARGURA_JANELA))
+    opcoes.add_argument("-height")
+    opcoes.add_argument(str(ALTURA_JANELA))
+    if economia:
+        for nome, valor in PREFERENCIAS_ECONOMIA.items():
+            opcoes.set_preference(nome, valor)
+    return opcoes
+
+
+def abrir_navegador(perfil=PERFIL_PADRAO, opcoes=None, headless=False):
+    """Abre o Firefox usando o perfil persistente (cookies e sessão do WhatsApp são mantidos)"""
+    opcoes = opcoes or Options()
+    if headless:
+        opcoes.add_argument("-headless")
+    opcoes.add_argument("-profile")
+    opcoes.add_argument(str(caminho_perfil(perfil)))
+    driver = webdriver.Firefox(service=Service(obter_geckodriver()), options=opcoes)
+    driver.set_page_load_timeout(TIMEOUT_CARREGAMENTO_PAGINA)
+    return driver
+
+
+def detectar_estado(driver):
+    """Retorna 'autenticado', 'qrcode' ou False enquanto a página ainda carrega"""
+    if driver.find_elements(By.CSS_SELECTOR, CSS_PAINEL_LATERAL):
+        return "autenticado"
+    if driver.find_elements(By.CSS_SELECTOR, CSS_QRCODE):
+        return "qrcode"
+    return False
+
+
+def recarregar_aplicativo(driver, cancelamento=None):
+    """
+    Recarrega o WhatsApp Web na mesma sessão para liberar a memória acumulada pela aba
+
+    Deve ser chamado num ponto seguro, sem mensagem aguardando confirmação.
+    """
+    driver.get(URL_WHATSAPP)
+    aguardar_autenticacao(driver, permitir_qrcode=False, cancelamento=cancelamento)
+
+
+def aguardar_autenticacao(driver, timeout_qrcode=180, timeout_deteccao=15, permitir_qrcode=True,
+                          cancelamento=None):
+    """
+    Aguarda a sessão do WhatsApp Web ficar autenticada
+
+    Se o perfil já estiver logado, o painel lateral (#side) aparece em poucos segundos
+    e não é necessário escanear o QR code.
+
+    Args:
+        permitir_qrcode: False quando ninguém pode escanear o QR code (ex.: navegador headless)
+        cancelamento: TokenCancelamento que interrompe a espera (inclusive a do QR code)
+
+    Raises:
+        TimeoutException: Se a autenticação não for concluída no tempo máximo
+        RuntimeError: Se o perfil não estiver logado e o QR code não for permitido
+        EnvioCancelado: Se o cancelamento for pedido durante a espera
+    """
+    try:
+        estado = aguardar(driver, timeout_deteccao, detectar_estado, cancelamento, intervalo=0.25)
+    except TimeoutException:
+        estado = None
+
+    if estado == "autenticado":
+        return "sessao_existente"
+    if not permitir_qrcode:
+        raise RuntimeError("Perfil não autenticado: abra o aplicativo com janela uma vez e escaneie o QR code")
+
+    print("Por favor, escaneie o QR code para autenticar...")
+    aguardar(driver, timeout_qrcode, lambda d: detectar_estado(d) == "autenticado", cancelamento, intervalo=0.5)
+    return "qrcode"
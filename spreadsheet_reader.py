@@ -0,0 +1,163 @@
+import codecs
+import csv
+import io
+import os
+import threading
+
+COLUNAS_OBRIGATORIAS = ['Nome', 'Telefone', 'Empresa']
+EXTENSOES_SUPORTADAS = ['xlsx', 'csv']
+
+# Quantidade de bytes lidos para detectar a codificação e o separador de arquivos CSV
+AMOSTRA_CSV = 64 * 1024
+
+
+class PlanilhaInvalida(Exception):
+    """Planilha em formato não suportado ou sem as colunas obrigatórias"""
+
+
+def _cp1252_nos_erros(erro):
+    """Decodifica como cp1252 os bytes que não são UTF-8 válido"""
+    return erro.object[erro.start:erro.end].decode('cp1252', errors='replace'), erro.end
+
+
+# A codificação é detectada só pela amostra: um arquivo cp1252 com o início todo em ASCII
+# passa como UTF-8, e os acentos mais adiante são lidos como cp1252 em vez de interromper a leitura
+codecs.register_error('utf8_ou_cp1252', _cp1252_nos_erros)
+
+
+def _linhas_xlsx(caminho, aba=None):
+    from openpyxl import load_workbook
+
+    # read_only percorre as linhas sob demanda, sem carregar a pasta de trabalho inteira
+    pasta = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        if aba is not None and aba not in pasta.sheetnames:
+            raise PlanilhaInvalida(f"A planilha não contém a aba \"{aba}\"")
+        planilha = pasta[aba] if aba is not None else pasta.active
+        for linha in planilha.iter_rows(values_only=True):
+            yield linha
+    finally:
+        pasta.close()
+
+
+def listar_abas(caminho):
+    """
+    Nomes das abas de uma planilha .xlsx, na ordem da pasta de trabalho
+
+    Arquivos CSV têm uma única "aba", representada por None.
+    """
+    if _extensao(caminho) != 'xlsx':
+        return [None]
+
+    from openpyxl import load_workbook
+
+    pasta = load_workbook(caminho, read_only=True)
+    try:
+        return list(pasta.sheetnames)
+    finally:
+        pasta.close()
+
+
+def _linhas_csv(caminho):
+    with open(caminho, 'rb') as arquivo:
+        amostra = arquivo.read(AMOSTRA_CSV)
+    try:
+        amostra.decode('utf-8')
+        codificacao = 'utf-8-sig'
+    except UnicodeDecodeError as e:
+        # Um caractere cortado no fim da amostra não invalida o UTF-8; qualquer outro erro
+        # indica um arquivo exportado pelo Excel em português, que costuma vir em cp1252
+        codificacao = 'utf-8-sig' if e.start >= len(amostra) - 3 else 'cp1252'
+
+    # O separador é o mais frequente no cabeçalho (';' é o padrão do Excel em português)
+    cabecalho = amostra.decode(codificacao, errors='ignore').splitlines()[:1] or ['']
+    separador = max(';,\t', key=cabecalho[0].count)
+
+    erros = 'utf8_ou_cp1252' if codificacao == 'utf-8-sig' else 'replace'
+    with io.open(caminho, newline='', encoding=codificacao, errors=erros) as arquivo:
+        for linha in csv.reader(arquivo, delimiter=separador):
+            yield tuple(valor if valor != '' else None for valor in linha)
+
+
+def _extensao(caminho):
+    return os.path.splitext(caminho)[1].lower().lstrip('.')
+
+
+def iterar_linhas(caminho, aba=None):
+    """
+    Percorre as linhas da planilha (.xlsx ou .csv) como tuplas, incluindo o cabeçalho
+
+    Args:
+        aba: Nome da aba de uma planilha .xlsx (padrão: a aba ativa); ignorado em arquivos CSV
+    """
+    extensao = _extensao(caminho)
+    if extensao == 'xlsx':
+        return _linhas_xlsx(caminho, aba)
+    if extensao == 'csv':
+        return _linhas_csv(caminho)
+    raise PlanilhaInvalida(f"Formato de arquivo não suportado: .{extensao}")
+
+
+def _indices_colunas(cabecalho):
+    colunas = [str(valor).strip().title() if valor is not None else '' for valor in cabecalho]
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in colunas]
+    if faltando:
+        raise PlanilhaInvalida(
+            "A planilha não contém todas as colunas necessárias (Nome, Telefone, Empresa)"
+        )
+    return {coluna: colunas.index(coluna) for coluna in COLUNAS_OBRIGATORIAS}
+
+
+def validar_cabecalho(caminho, aba=None):
+    """Lê apenas a primeira linha e valida as colunas obrigatórias"""
+    linhas = iterar_linhas(caminho, aba)
+    try:
+        cabecalho = next(linhas, None)
+    finally:
+        linhas.close()
+    if cabecalho is None:
+        raise PlanilhaInvalida("A planilha está vazia")
+    return _indices_colunas(cabecalho)
+
+
+def iterar_contatos(caminho, aba=None):
+    """
+    Gera os contatos da planilha sob demanda, um dicionário por linha
+
+    Yields:
+        dict: {'Nome': valor, 'Telefone': valor, 'Empresa': valor}
+    """
+    linhas = iterar_linhas(caminho, aba)
+    try:
+        indices = _indices_colunas(next(linhas, None) or ())
+        for linha in linhas:
+            if not any(valor is not None for valor in linha):
+                continue
+            yield {
+                coluna: linha[indice] if indice < len(linha) else None
+                for coluna, indice in indices.items()
+            }
+    finally:
+        linhas.close()
+
+
+def contar_linhas(caminho, aba=None):
+    """Conta as linhas de dados (não vazias) da planilha"""
+    return sum(1 for _ in iterar_contatos(caminho, aba))
+
+
+def contar_em_segundo_plano(caminho, callback, aba=None):
+    """
+    Conta as linhas em uma thread separada e chama callback(total) ao terminar
+
+    Em caso de erro, chama callback(None, erro).
+    """
+    def contar():
+        try:
+            callback(contar_linhas(caminho, aba))
+        except Exception as e:
+            callback(None, e)
+
+    thread = threading.Thread(target=contar, daemon=True)
+    thread.start()
+    return thread
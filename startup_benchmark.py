@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DIRETORIO = Path(__file__).resolve().parent
+
+# Pacotes que não podem ser carregados antes da janela: pandas vem ao selecionar a planilha,
+# o Selenium ao enviar
+PACOTES_ADIADOS = ("pandas", "numpy", "openpyxl", "selenium", "webdriver_manager")
+
+# Linha do -X importtime: "import time: <próprio us> | <acumulado us> | <recuo><módulo>"
+LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Mede a inicialização do disparador: perfil de importação do main.py, tempo até a "
+                    "janela aparecer e tempo até o primeiro envio (CLI contra o WhatsApp falso local)."
+    )
+    parser.add_argument("--medir", nargs="+", choices=["importacao", "janela", "envio"],
+                        default=["importacao", "janela", "envio"], help="O que medir (padrão: tudo)")
+    parser.add_argument("--modulo", default="main", help="Módulo cujo perfil de importação é gerado (padrão: main)")
+    parser.add_argument("--top", type=int, default=15, help="Módulos mais lentos exibidos no perfil (padrão: 15)")
+    parser.add_argument("--comando", nargs="+",
+                        help="Comando que abre o aplicativo, ex.: o executável do PyInstaller "
+                             "(padrão: python main.py)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções de cada medida (padrão: 3)")
+    parser.add_argument("--contatos", type=int, default=3, help="Contatos da campanha do primeiro envio (padrão: 3)")
+    parser.add_argument("--com-janela", action="store_true",
+                        help="Abre o Firefox com janela na medida do primeiro envio (padrão: headless)")
+    parser.add_argument("--timeout", type=float, default=120, help="Limite (s) de cada execução (padrão: 120)")
+    parser.add_argument("--limite-importacao", type=float, help="Falha se a importação passar deste tempo (ms)")
+    parser.add_argument("--limite-janela", type=float, help="Falha se a janela demorar mais que isso (s)")
+    parser.add_argument("--limite-envio", type=float, help="Falha se o primeiro envio demorar mais que isso (s)")
+    parser.add_argument("--saida", help="Arquivo JSON onde o resultado é salvo")
+    return parser
+
+
+def perfil_importacao(modulo="main"):
+    """
+    Importa o módulo num processo novo com -X importtime e interpreta o relatório
+
+    Returns:
+        dict: {'total_ms', 'importacoes': [{'modulo', 'proprio_ms', 'acumulado_ms', 'nivel'}], 'erro'}
+    """
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                              capture_output=True, text=True, cwd=DIRETORIO)
+    importacoes = []
+    outras = []
+    for linha in processo.stderr.splitlines():
+        encontrada = LINHA_IMPORTTIME.match(linha)
+        if encontrada is None:
+            outras.append(linha)
+            continue
+        proprio, acumulado, recuo, nome = encontrada.groups()
+        importacoes.append({"modulo": nome, "proprio_ms": int(proprio) / 1000,
+                            "acumulado_ms": int(acumulado) / 1000, "nivel": len(recuo) // 2})
+
+    return {
+        "total_ms": round(sum(importacao["proprio_ms"] for importacao in importacoes), 1),
+        "importacoes": importacoes,
+        "erro": (outras[-1] if outras else "erro desconhecido") if processo.returncode else None,
+    }
+
+
+def resumir_importacao(perfil, top):
+    """Tempo por pacote de primeiro nível e os módulos mais lentos (tempo próprio)"""
+    pacotes = {}
+    for importacao in perfil["importacoes"]:
+        pacote = importacao["modulo"].split(".")[0]
+        pacotes[pacote] = pacotes.get(pacote, 0) + importacao["proprio_ms"]
+    return {
+        "total_ms": perfil["total_ms"],
+        "erro": perfil["erro"],
+        "pacotes": sorted(((nome, round(ms, 1)) for nome, ms in pacotes.items()), key=lambda item: -item[1])[:top],
+        "modulos": [
+            (importacao["modulo"], importacao["proprio_ms"])
+            for importacao in sorted(perfil["importacoes"], key=lambda item: -item["proprio_ms"])[:top]
+        ],
+        "adiados_carregados": sorted({nome for nome, _ in pacotes.items() if nome in PACOTES_ADIADOS}),
+    }
+
+
+def imprimir_importacao(resumo, modulo):
+    print(f"Importação de {modulo}: {resumo['total_ms']:.1f} ms", file=sys.stderr)
+    if resumo["erro"]:
+        print(f"  Importação interrompida: {resumo['erro']}", file=sys.stderr)
+    print("  Por pacote:", file=sys.stderr)
+    for nome, ms in resumo["pacotes"]:
+        print(f"    {ms:>8.1f} ms  {nome}", file=sys.stderr)
+    print("  Módulos mais lentos:", file=sys.stderr)
+    for nome, ms in resumo["modulos"]:
+        print(f"    {ms:>8.1f} ms  {nome}", file=sys.stderr)
+    if resumo["adiados_carregados"]:
+        print(f"  Carregados antes da janela: {', '.join(resumo['adiados_carregados'])}", file=sys.stderr)
+
+
+def _encerrar(processo):
+    if processo.poll() is None:
+        processo.terminate()
+        try:
+            processo.wait(10)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+            processo.wait()
+
+
+def medir_janela(comando, timeout):
+    """
+    Abre o aplicativo e mede o tempo (s) até a janela ficar pronta
+
+    O main.py grava o marco "janela" no arquivo de BITTECH_MARCADOR_INICIO logo depois de montar
+    a interface; o aplicativo é encerrado em seguida.
+    """
+    with tempfile.TemporaryDirectory(prefix="bittech_inicio_") as temporario:
+        marcador = Path(temporario) / "marcos.jsonl"
+        ambiente = {**os.environ, "BITTECH_DADOS": temporario, "BITTECH_MARCADOR_INICIO": str(marcador)}
+        # Saída de erros num arquivo: um pipe cheio e não lido travaria o aplicativo
+        erros = open(Path(temporario) / "erros.log", "w+b")
+        inicio = time.time()
+        processo = subprocess.Popen(comando, cwd=DIRETORIO, env=ambiente, stdout=subprocess.DEVNULL, stderr=erros)
+        try:
+            while time.time() - inicio < timeout:
+                if marcador.exists():
+                    for linha in marcador.read_text(encoding="utf-8").splitlines():
+                        marco = json.loads(linha)
+                        if marco["evento"] == "janela":
+                            return marco["ts"] - inicio
+                if processo.poll() is not None:
+                    erros.seek(0)
+                    erro = erros.read().decode(errors="replace").strip().splitlines()
+                    raise RuntimeError(f"O aplicativo encerrou antes da janela: {erro[-1] if erro else processo.returncode}")
+                time.sleep(0.01)
+            raise RuntimeError(f"A janela não apareceu em {timeout}s")
+        finally:
+            _encerrar(processo)
+            erros.close()
+
+
+def medir_primeiro_envio(contatos, headless, timeout):
+    """
+    Executa o cli.py contra o WhatsApp falso local e mede, desde o início do processo, o tempo (s)
+    até a campanha começar (importações e contagem) e até a primeira mensagem confirmada
+
+    Requer Firefox e geckodriver no PATH; não acessa a internet.
+    """
+    from fake_whatsapp import ServidorFalso
+
+    servidor = ServidorFalso().iniciar()
+    try:
+        with tempfile.TemporaryDirectory(prefix="bittech_inicio_") as temporario:
+            planilha = Path(temporario) / "contatos.csv"
+            planilha.write_text("Nome;Telefone;Empresa\n" + "".join(
+                f"Contato {numero};+55119{numero:08d};Empresa\n" for numero in range(contatos)
+            ), encoding="utf-8")
+
+            comando = [sys.executable, str(DIRETORIO / "cli.py"), str(planilha), "--remetente", "Benchmark",
+                       "--perfil", "benchmark", "--recomecar", "--tentativas", "1"]
+            if headless:
+                comando.append("--headless")
+            ambiente = {**os.environ, "BITTECH_DADOS": temporario, "BITTECH_WHATSAPP_URL": servidor.url}
+
+            medida = {"inicio_campanha_s": None, "primeiro_envio_s": None}
+            inicio = time.time()
+            processo = subprocess.Popen(comando, cwd=DIRETORIO, env=ambiente, text=True,
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            # Encerra o processo se ele travar sem emitir eventos
+            limite = threading.Timer(timeout, processo.terminate)
+            limite.start()
+            try:
+                for linha in processo.stdout:
+                    evento = json.loads(linha)
+                    if evento["evento"] == "inicio" and medida["inicio_campanha_s"] is None:
+                        medida["inicio_campanha_s"] = evento["ts"] - inicio
+                    elif evento["evento"] == "progresso" and evento["atual"] >= 1 and evento["sucesso"]:
+                        medida["primeiro_envio_s"] = evento["ts"] - inicio
+                        break
+                    elif evento["evento"] == "erro":
+                        raise RuntimeError(evento["mensagem"])
+            finally:
+                limite.cancel()
+                _encerrar(processo)
+            if medida["primeiro_envio_s"] is None:
+                raise RuntimeError("Nenhuma mensagem foi confirmada")
+            return medida
+    finally:
+        servidor.parar()
+
+
+def _estatisticas(valores):
+    return {"min_s": round(min(valores), 3), "mediana_s": round(statistics.median(valores), 3),
+            "max_s": round(max(valores), 3)}
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    relatorio = {}
+    regressoes = []
+
+    if "importacao" in args.medir:
+        resumo = resumir_importacao(perfil_importacao(args.modulo), args.top)
+        imprimir_importacao(resumo, args.modulo)
+        relatorio["importacao"] = resumo
+        if resumo["adiados_carregados"]:
+            regressoes.append(f"{args.modulo} carrega {', '.join(resumo['adiados_carregados'])} na inicialização")
+        if args.limite_importacao and resumo["total_ms"] > args.limite_importacao:
+            regressoes.append(f"importação em {resumo['total_ms']:.1f} ms (limite {args.limite_importacao} ms)")
+
+    if "janela" in args.medir:
+        comando = args.comando or [sys.executable, str(DIRETORIO / "main.py")]
+        tempos = [medir_janela(comando, args.timeout) for _ in range(args.repeticoes)]
+        relatorio["janela"] = _estatisticas(tempos)
+        print(f"Janela pronta: mediana {relatorio['janela']['mediana_s']:.2f}s "
+              f"(mín. {relatorio['janela']['min_s']:.2f}s)", file=sys.stderr)
+        if args.limite_janela and relatorio["janela"]["mediana_s"] > args.limite_janela:
+            regressoes.append(f"janela em {relatorio['janela']['mediana_s']:.2f}s (limite {args.limite_janela}s)")
+
+    if "envio" in args.medir:
+        medidas = [medir_primeiro_envio(args.contatos, not args.com_janela, args.timeout)
+                   for _ in range(args.repeticoes)]
+        relatorio["envio"] = {
+            "inicio_campanha": _estatisticas([medida["inicio_campanha_s"] for medida in medidas]),
+            "primeiro_envio": _estatisticas([medida["primeiro_envio_s"] for medida in medidas]),
+        }
+        primeiro = relatorio["envio"]["primeiro_envio"]
+        print(f"Primeiro envio: mediana {primeiro['mediana_s']:.2f}s (mín. {primeiro['min_s']:.2f}s), "
+              f"campanha iniciada em {relatorio['envio']['inicio_campanha']['mediana_s']:.2f}s", file=sys.stderr)
+        if args.limite_envio and primeiro["mediana_s"] > args.limite_envio:
+            regressoes.append(f"primeiro envio em {primeiro['mediana_s']:.2f}s (limite {args.limite_envio}s)")
+
+    relatorio["regressoes"] = regressoes
+    print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    for regressao in regressoes:
+        print(f"Regressão: {regressao}", file=sys.stderr)
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+
+
+class AtualizadorUI:
+    """
+    Agrupa as alterações dos controles e envia ao Flet em no máximo `fps` quadros por segundo
+
+    Alterações agendadas com a mesma chave se substituem (só a mais recente é aplicada), então
+    uma rajada de atualizações de progresso vira um único page.update(). O estado final é
+    garantido chamando descarregar().
+    """
+
+    def __init__(self, page, fps=10):
+        self.page = page
+        self.intervalo = 1 / fps
+        self._pendentes = {}
+        self._sujo = False
+        self._ultimo_envio = 0.0
+        self._condicao = threading.Condition()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    def agendar(self, chave, funcao):
+        """Agenda funcao() (que altera controles) para o próximo quadro, substituindo a anterior da chave"""
+        with self._condicao:
+            self._pendentes[chave] = funcao
+            self._sujo = True
+            self._condicao.notify()
+
+    def solicitar(self):
+        """Marca a página para atualização no próximo quadro (controles já alterados diretamente)"""
+        with self._condicao:
+            self._sujo = True
+            self._condicao.notify()
+
+    def descarregar(self):
+        """Aplica imediatamente tudo o que está pendente e atualiza a página"""
+        with self._condicao:
+            pendentes = self._retirar_pendentes()
+        self._aplicar(pendentes)
+
+    def _retirar_pendentes(self):
+        pendentes = list(self._pendentes.values())
+        self._pendentes.clear()
+        self._sujo = False
+        return pendentes
+
+    def _aplicar(self, pendentes):
+        for funcao in pendentes:
+            funcao()
+        self._ultimo_envio = time.monotonic()
+        self.page.update()
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while not self._sujo:
+                    self._condicao.wait()
+
+            # Respeita o intervalo mínimo entre quadros, acumulando as alterações nesse meio-tempo
+            espera = self._ultimo_envio + self.intervalo - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+
+            with self._condicao:
+                if not self._sujo:
+                    continue  # Já descarregado por outra thread
+                pendentes = self._retirar_pendentes()
+            try:
+                self._aplicar(pendentes)
+            except Exception as e:
+                print(f"Erro ao atualizar a interface: {e}")
+
+
+def formatar_tempo(segundos):
+    """Formata uma duração como 'H:MM:SS' (ou 'MM:SS' abaixo de uma hora)"""
+    horas, resto = divmod(int(segundos), 3600)
+    return f"{horas}:{resto // 60:02d}:{resto % 60:02d}" if horas else f"{resto // 60:02d}:{resto % 60:02d}"
+
+
+class MedidorVazao:
+    """Calcula a vazão (contatos por minuto) e o tempo restante numa janela móvel"""
+
+    def __init__(self, janela=20):
+        self._amostras = deque(maxlen=janela + 1)
+
+    def reiniciar(self):
+        self._amostras.clear()
+
+    def registrar(self, concluidos):
+        """Registra o total de contatos concluídos até agora"""
+        if not self._amostras or concluidos > self._amostras[-1][1]:
+            self._amostras.append((time.monotonic(), concluidos))
+
+    def por_minuto(self):
+        if len(self._amostras) < 2:
+            return None
+        (inicio, feitos_inicio), (fim, feitos_fim) = self._amostras[0], self._amostras[-1]
+        if fim <= inicio:
+            return None
+        return (feitos_fim - feitos_inicio) * 60 / (fim - inicio)
+
+    def texto(self, restantes):
+        """Texto exibido ao lado do contador, ex.: '4.2 msg/min · restante ~12:30'"""
+        taxa = self.por_minuto()
+        if not taxa:
+            return ""
+        return f"{taxa:.1f} msg/min · restante ~{formatar_tempo(restantes * 60 / taxa)}"
@@ -0,0 +1,233 @@
+import time
+from enum import Enum
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (ElementClickInterceptedException, ElementNotInteractableException,
+                                        StaleElementReferenceException, TimeoutException, WebDriverException)
+from cancellation import PRAZO_CONFIRMACAO_CANCELAMENTO, EnvioCancelado
+
+# Seletores da conversa aberta no WhatsApp Web
+XPATH_BOTAO_ENVIAR = (
+    '//*[@id="main"]/footer/div[1]/div/span/div/div[2]/div[2]/button'
+    ' | //*[@id="main"]/footer//span[@data-icon="send"]/ancestor::button[1]'
+)
+CSS_CAIXA_TEXTO = '#main footer div[contenteditable="true"]'
+
+CSS_DIALOGO = 'div[data-animate-modal-popup="true"], div[role="dialog"]'
+CSS_BOTOES_DIALOGO = 'div[data-animate-modal-popup="true"] button, div[role="dialog"] button'
+
+# Trechos do aviso exibido pelo WhatsApp Web quando o número não tem conta
+TEXTOS_NAO_REGISTRADO = (
+    "inválido", "invalid", "não está no whatsapp", "isn't on whatsapp", "not on whatsapp",
+)
+
+# Erros em que o navegador recusou o clique em enviar antes de executá-lo: nada foi enviado
+CLIQUE_RECUSADO = (ElementClickInterceptedException, ElementNotInteractableException, StaleElementReferenceException)
+
+# Intervalo entre verificações da página (em segundos)
+INTERVALO_VERIFICACAO = 0.1
+
+# Lê em uma única chamada o id e o status (tique) da última mensagem enviada em #main
+SCRIPT_ULTIMA_MENSAGEM = """
+var msgs = document.querySelectorAll('#main div.message-out');
+if (!msgs.length) { return null; }
+var ultima = msgs[msgs.length - 1];
+var linha = ultima.closest('[data-id]');
+var id = linha ? linha.getAttribute('data-id') : String(msgs.length);
+var status = 'desconhecido';
+if (ultima.querySelector('span[data-icon="msg-time"]')) {
+    status = 'pendente';
+} else if (ultima.querySelector('span[data-icon="msg-check"], span[data-icon="msg-dblcheck"]')) {
+    status = 'enviado';
+}
+return [id, status];
+"""
+
+SCRIPT_TEXTO_DIALOGO = """
+var dialogo = document.querySelector(arguments[0]);
+return dialogo ? dialogo.innerText : null;
+"""
+
+
+class MotivoFalha(str, Enum):
+    """Motivo pelo qual uma mensagem não foi enviada"""
+    NUMERO_INVALIDO = "numero_invalido"            # Rejeitado pela validação local
+    NAO_REGISTRADO = "nao_registrado"              # WhatsApp informou que o número não tem conta
+    TIMEOUT_CARREGAMENTO = "timeout_carregamento"  # A conversa não ficou pronta a tempo
+    FALHA_CLIQUE = "falha_clique"                  # O clique em enviar falhou (nada foi enviado)
+    NAO_CONFIRMADO = "nao_confirmado"              # Qualquer falha depois do clique (bolha ou tique ausentes)
+    ERRO = "erro"                                  # Qualquer outro erro do navegador antes do clique
+
+
+class FalhaEnvio(Exception):
+    """Falha tipada no envio de uma mensagem"""
+
+    def __init__(self, motivo, detalhe=""):
+        super().__init__(f"{motivo.value}: {detalhe}" if detalhe else motivo.value)
+        self.motivo = motivo
+        self.detalhe = detalhe
+
+
+class Cronometro:
+    """Mede a duração de cada fase do envio de uma mensagem"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.marco = self.inicio
+        self.tempos = {}
+
+    def marcar(self, fase):
+        """Registra o tempo gasto desde o último marco na fase informada"""
+        agora = time.perf_counter()
+        self.tempos[fase] = round(agora - self.marco, 3)
+        self.marco = agora
+
+    def finalizar(self):
+        """Registra o tempo total e retorna o dicionário de tempos"""
+        self.tempos["total"] = round(time.perf_counter() - self.inicio, 3)
+        return self.tempos
+
+
+def aguardar(driver, timeout, condicao, cancelamento=None, intervalo=INTERVALO_VERIFICACAO):
+    """Espera a condição; com um TokenCancelamento, levanta EnvioCancelado na próxima verificação"""
+    if cancelamento is not None:
+        verificar = condicao
+
+        def condicao(d):
+            cancelamento.verificar()
+            return verificar(d)
+
+    return WebDriverWait(driver, timeout, poll_frequency=intervalo).until(condicao)
+
+
+def ultima_mensagem_enviada(driver):
+    """Retorna (id, status) da última mensagem enviada na conversa aberta, ou None"""
+    resultado = driver.execute_script(SCRIPT_ULTIMA_MENSAGEM)
+    return tuple(resultado) if resultado else None
+
+
+def verificar_dialogo_erro(driver):
+    """Levanta FalhaEnvio se o WhatsApp Web estiver exibindo o aviso de número sem conta"""
+    texto = driver.execute_script(SCRIPT_TEXTO_DIALOGO, CSS_DIALOGO)
+    if texto and any(trecho in texto.lower() for trecho in TEXTOS_NAO_REGISTRADO):
+        raise FalhaEnvio(MotivoFalha.NAO_REGISTRADO, " ".join(texto.split()))
+
+
+def fechar_dialogo(driver):
+    """Fecha o aviso aberto (se houver) para liberar a página para o próximo contato"""
+    try:
+        for botao in driver.find_elements(By.CSS_SELECTOR, CSS_BOTOES_DIALOGO):
+            if botao.is_displayed():
+                botao.click()
+                return
+    except WebDriverException:
+        pass
+
+
+def aguardar_caixa_texto(driver, timeout=15, cancelamento=None):
+    """
+    Aguarda a caixa de texto da conversa e o botão de enviar ficarem prontos
+
+    Encerra a espera assim que o WhatsApp Web exibir o aviso de número sem conta.
+
+    Raises:
+        FalhaEnvio: NAO_REGISTRADO ou TIMEOUT_CARREGAMENTO
+        EnvioCancelado: Se o cancelamento for pedido durante a espera
+    """
+    def condicao(d):
+        verificar_dialogo_erro(d)
+        if not d.find_elements(By.CSS_SELECTOR, CSS_CAIXA_TEXTO):
+            return False
+        botoes = d.find_elements(By.XPATH, XPATH_BOTAO_ENVIAR)
+        if botoes and botoes[0].is_displayed() and botoes[0].is_enabled():
+            return botoes[0]
+        return False
+
+    try:
+        return aguardar(driver, timeout, condicao, cancelamento)
+    except TimeoutException:
+        raise FalhaEnvio(MotivoFalha.TIMEOUT_CARREGAMENTO, f"conversa não carregou em {timeout}s")
+
+
+def aguardar_nova_mensagem(driver, id_anterior, timeout=10):
+    """Aguarda a bolha da mensagem recém-enviada aparecer em #main"""
+    def condicao(d):
+        ultima = ultima_mensagem_enviada(d)
+        return ultima if ultima and ultima[0] != id_anterior else False
+
+    return aguardar(driver, timeout, condicao)
+
+
+def aguardar_confirmacao(driver, id_mensagem, timeout=30, cancelamento=None):
+    """
+    Aguarda a mensagem sair do status pendente (relógio) para enviado (tique)
+
+    A mensagem já foi clicada, então o cancelamento não interrompe a espera de imediato:
+    ela continua por até PRAZO_CONFIRMACAO_CANCELAMENTO segundos após o pedido.
+    """
+    def condicao(d):
+        if cancelamento is not None and cancelamento.expirado(PRAZO_CONFIRMACAO_CANCELAMENTO):
+            raise EnvioCancelado()
+        ultima = ultima_mensagem_enviada(d)
+        if ultima and ultima[0] == id_mensagem and ultima[1] == "enviado":
+            return ultima
+        return False
+
+    return aguardar(driver, timeout, condicao)
+
+
+def enviar_ate_bolha(driver, cronometro, timeout_carregamento=15, timeout_confirmacao=30, cancelamento=None):
+    """
+    Clica em enviar assim que a conversa estiver pronta e aguarda a bolha da mensagem
+
+    Returns:
+        tuple: (id, status) da mensagem recém-enviada em #main
+
+    Raises:
+        FalhaEnvio: NAO_REGISTRADO, TIMEOUT_CARREGAMENTO ou FALHA_CLIQUE antes do clique;
+            NAO_CONFIRMADO para qualquer falha depois dele, pois a mensagem pode ter saído
+        EnvioCancelado: Se o cancelamento for pedido antes do clique
+    """
+    btn_enviar = aguardar_caixa_texto(driver, timeout_carregamento, cancelamento)
+    ultima = ultima_mensagem_enviada(driver)
+    id_anterior = ultima[0] if ultima else None
+    cronometro.marcar("carregamento")
+
+    try:
+        btn_enviar.click()
+    except CLIQUE_RECUSADO as e:
+        raise FalhaEnvio(MotivoFalha.FALHA_CLIQUE, getattr(e, "msg", None) or str(e))
+    except Exception as e:  # O clique pode ter sido executado (ex.: o comando expirou)
+        raise FalhaEnvio(MotivoFalha.NAO_CONFIRMADO, f"clique sem resposta: {getattr(e, 'msg', None) or str(e)}")
+
+    try:
+        id_mensagem, status = aguardar_nova_mensagem(driver, id_anterior, timeout_confirmacao)
+    except Exception as e:  # Inclui TimeoutException e falhas de conexão com o navegador
+        raise FalhaEnvio(MotivoFalha.NAO_CONFIRMADO,
+                         f"bolha não apareceu após o clique: {getattr(e, 'msg', None) or str(e)}")
+    cronometro.marcar("bolha")
+    return id_mensagem, status
+
+
+def confirmar_envio(driver, cronometro, id_mensagem, status, timeout_confirmacao=30, cancelamento=None):
+    """
+    Aguarda a mensagem já exibida em #main sair do status pendente (relógio)
+
+    Pode ser chamada depois de outras ações no painel lateral, desde que a conversa
+    em #main continue sendo a da mensagem.
+
+    Returns:
+        str: Status final da mensagem ('enviado')
+
+    Raises:
+        FalhaEnvio: NAO_CONFIRMADO (também quando o envio é cancelado antes do tique)
+    """
+    if status != "enviado":
+        try:
+            id_mensagem, status = aguardar_confirmacao(driver, id_mensagem, timeout_confirmacao, cancelamento)
+        except TimeoutException:
+            raise FalhaEnvio(MotivoFalha.NAO_CONFIRMADO, f"sem confirmação em {timeout_confirmacao}s")
+        except EnvioCancelado:
+            raise FalhaEnvio(MotivoFalha.NAO_CONFIRMADO, "envio cancelado antes da confirmação")
+    cronometro.marcar("confirmacao")
+    return status
@@ -1,160 +1,445 @@
-from urllib.parse import quote
 import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options
-from webdriver_manager.firefox import GeckoDriverManager
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from contextlib import nullcontext
+from phone_numbers import eh_chave_canonica, normalizar_telefone
+from chat_navigation import NAVEGACAO_NA_PAGINA, NAVEGACAO_RECARREGAR, abrir_conversa, buscar_conversa
+from cancellation import EnvioCancelado
+from contact_producer import ProdutorContatos
+from retry_queue import FilaRetentativas
+from session_manager import (PERFIL_PADRAO, URL_WHATSAPP, abrir_navegador, aguardar_autenticacao, opcoes_navegador,
+                             recarregar_aplicativo)
+from wait_engine import Cronometro, FalhaEnvio, MotivoFalha, confirmar_envio, enviar_ate_bolha, fechar_dialogo
 
-def format_phone_number(phone):
-    try:
-        # Remove todos os caracteres que não são dígitos
-        digits_only = ''.join(filter(str.isdigit, phone))
+# Quantidade de mensagens enviadas sem recarregar a página (modo na página) antes de recarregar
+# o WhatsApp Web para liberar a memória acumulada pela aba
+RECARREGAR_A_CADA = 300
 
-        # Extrai o código de área (assume-se que são os 2 primeiros dígitos)
-        area_code = digits_only[:2]
 
-        # Formata como +55 seguido pelo código de área e número
-        formatted = f"+55{area_code}{digits_only[2:]}"
-
-        return formatted
-    except Exception as e:
-        print(f'Erro: {e}')
-        return None
+def format_phone_number(phone):
+    """Valida o telefone (DDD, tamanho, código do país) e retorna a chave E.164, ou None se inválido"""
+    return normalizar_telefone(phone)
 
 
-def iniciar_sessao_whatsapp():
-    """Inicia uma sessão do WhatsApp Web e aguarda autenticação via QR code"""
-    print("Iniciando sessão do WhatsApp Web...")
+def telefone_canonico(telephone):
+    """Retorna a chave E.164 do telefone, sem revalidar números já preparados"""
+    return telephone if eh_chave_canonica(telephone) else format_phone_number(telephone)
 
-    # Configurar o Firefox
-    firefox_options = Options()
-    firefox_options.add_argument("--disable-gpu")
-    firefox_options.add_argument("--window-size=1920,1080")
-    firefox_options.add_argument("--no-sandbox")
-    firefox_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36")
 
-    driver = webdriver.Firefox(service=Service(GeckoDriverManager().install()))
+def iniciar_sessao_whatsapp(perfil=PERFIL_PADRAO, headless=False, cancelamento=None, economia=True):
+    """
+    Inicia uma sessão do WhatsApp Web, reaproveitando o perfil salvo ou aguardando o QR code
 
-    # Inicia o driver com o serviço e as opções
+    Em modo headless o perfil precisa já estar autenticado, pois não há como escanear o QR code.
+    Retorna None (e fecha o navegador) se a autenticação falhar ou for cancelada.
 
-    # Abrir o WhatsApp Web
-    driver.get("https://web.whatsapp.com/")
+    Args:
+        economia: Aplica PREFERENCIAS_ECONOMIA (sem imagens/mídia, menos processos e cache)
+    """
+    print("Iniciando sessão do WhatsApp Web...")
 
-    print("Por favor, escaneie o QR code para autenticar...")
+    # Inicia o driver com o perfil persistente, o geckodriver em cache e as opções do disparador
+    driver = abrir_navegador(perfil, opcoes_navegador(economia), headless=headless)
 
-    # Aguardar até que o painel lateral esteja visível (indicando que o usuário está logado)
+    # Qualquer falha a partir daqui fecha o navegador: um Firefox órfão manteria o perfil
+    # persistente travado e impediria as próximas aberturas
     try:
-        WebDriverWait(driver, 180).until(
-            EC.presence_of_element_located((By.XPATH, "//div[@id='side']"))
-        )
+        # Abrir o WhatsApp Web (limitado por TIMEOUT_CARREGAMENTO_PAGINA)
+        driver.get(URL_WHATSAPP)
+
+        # Aguardar até que o painel lateral esteja visível (indicando que o usuário está logado)
+        modo = aguardar_autenticacao(driver, permitir_qrcode=not headless, cancelamento=cancelamento)
+        if modo == "sessao_existente":
+            print("Sessão anterior reaproveitada, QR code não necessário.")
         print("Autenticação concluída com sucesso!")
         return driver
+    except EnvioCancelado:
+        print("Autenticação cancelada.")
+        driver.quit()
+        return None
     except Exception as e:
         print(f"Erro na autenticação: {e}")
         driver.quit()
         return None
 
 
-def enviar_mensagem(driver, telephone, mensagem, nome_destinatario):
-    """Envia uma mensagem para um número específico usando uma sessão já autenticada"""
+class EnvioEmAndamento:
+    """
+    Mensagem de um contato entre o clique em enviar e a confirmação (tique)
+
+    Criado por iniciar_envio; concluir() aguarda a confirmação e retorna o resultado final.
+    Se o envio já falhou antes do clique, o resultado fica pronto desde a criação.
+    """
+
+    def __init__(self, nome, telefone, cronometro):
+        self.nome = nome
+        self.telefone = telefone
+        self.cronometro = cronometro
+        self.modo = None
+        self.id_mensagem = None
+        self.status = None
+        self.resultado = None
+
+    def falhar(self, motivo):
+        self.resultado = _resultado_falha(motivo, self.modo, self.cronometro)
+        return self
+
+    def concluir(self, driver, timeout_confirmacao=30, cancelamento=None):
+        """
+        Aguarda o tique da mensagem em #main (a conversa ainda deve ser a deste contato)
+
+        Depois de um cancelamento, a espera continua por no máximo PRAZO_CONFIRMACAO_CANCELAMENTO
+        segundos; sem o tique, a mensagem é registrada como NAO_CONFIRMADO.
+
+        Returns:
+            dict: {'sucesso': bool, 'status': str, 'motivo': MotivoFalha ou None,
+                   'navegacao': str, 'tempos': {fase: segundos}}
+        """
+        if self.resultado is not None:
+            return self.resultado
+
+        try:
+            status = confirmar_envio(driver, self.cronometro, self.id_mensagem, self.status, timeout_confirmacao,
+                                     cancelamento)
+        except FalhaEnvio as e:
+            print(f"Falha ao enviar mensagem para {self.nome}: {e}")
+            return self.falhar(e.motivo).resultado
+        except Exception as e:
+            # A bolha já apareceu: repetir o envio arriscaria uma mensagem duplicada
+            print(f"Erro ao confirmar mensagem para {self.nome}: {e}")
+            return self.falhar(MotivoFalha.NAO_CONFIRMADO).resultado
+
+        tempos = self.cronometro.finalizar()
+        print(f"Mensagem enviada com sucesso para {self.nome} ({self.telefone}) em {tempos['total']:.1f}s {tempos}")
+        self.resultado = {"sucesso": True, "status": status, "motivo": None, "navegacao": self.modo,
+                          "tempos": tempos}
+        return self.resultado
+
+
+def iniciar_envio(driver, telephone, mensagem, nome_destinatario, navegacao=NAVEGACAO_NA_PAGINA,
+                  resultado_busca=None, cancelamento=None):
+    """
+    Abre a conversa e clica em enviar, retornando assim que a bolha aparece em #main
+
+    A confirmação fica para EnvioEmAndamento.concluir, o que permite buscar o próximo
+    contato no painel lateral enquanto esta mensagem ainda está pendente.
+
+    Args:
+        navegacao: Modo de abertura da conversa (ver enviar_mensagem)
+        resultado_busca: Resultado de buscar_conversa feito antecipadamente para este número
+        cancelamento: TokenCancelamento verificado nas esperas anteriores ao clique
+
+    Returns:
+        EnvioEmAndamento
+
+    Raises:
+        EnvioCancelado: Se o cancelamento for pedido antes do clique (nada foi enviado)
+    """
+    envio = EnvioEmAndamento(nome_destinatario, telephone, Cronometro())
     try:
         # Formatar o número de telefone
-        telephone_formatado = format_phone_number(telephone)
+        telephone_formatado = telefone_canonico(telephone)
         if not telephone_formatado:
             print(f"Número inválido para {nome_destinatario}")
-            return False
+            return envio.falhar(MotivoFalha.NUMERO_INVALIDO)
 
         # Abrir conversa com o número específico
-        link_mensagem = f'https://web.whatsapp.com/send?phone={telephone_formatado}&text={quote(mensagem)}'
-
-        driver.get(link_mensagem)
+        envio.modo = abrir_conversa(driver, telephone_formatado, mensagem, navegacao, resultado_busca, cancelamento)
+        envio.cronometro.marcar("navegacao")
 
         print(f"Carregando conversa com {nome_destinatario}...")
 
-        btn_enviar = WebDriverWait(driver, 15).until(
-            EC.element_to_be_clickable((By.XPATH, '//*[@id="main"]/footer/div[1]/div/span/div/div[2]/div[2]/button'))
-        )
-        time.sleep(2)
-        btn_enviar.click()
-
-        time.sleep(5)
+        # Aguarda os sinais reais da página em vez de pausas fixas
+        envio.id_mensagem, envio.status = enviar_ate_bolha(driver, envio.cronometro, cancelamento=cancelamento)
+        return envio
 
-        print(f"Mensagem enviada com sucesso para {nome_destinatario} ({telephone})")
+    except EnvioCancelado:
+        raise
 
-        return True
+    except FalhaEnvio as e:
+        print(f"Falha ao enviar mensagem para {nome_destinatario}: {e}")
+        if e.motivo == MotivoFalha.NAO_REGISTRADO:
+            fechar_dialogo(driver)
+        return envio.falhar(e.motivo)
 
     except Exception as e:
         print(f"Erro ao enviar mensagem para {nome_destinatario}: {e}")
-        return False
+        return envio.falhar(MotivoFalha.ERRO)
+
 
+def enviar_mensagem(driver, telephone, mensagem, nome_destinatario, navegacao=NAVEGACAO_NA_PAGINA,
+                    cancelamento=None):
+    """
+    Envia uma mensagem para um número específico usando uma sessão já autenticada
+
+    Args:
+        navegacao: NAVEGACAO_NA_PAGINA troca de conversa sem recarregar o WhatsApp Web
+            (com o link send?phone= como alternativa); NAVEGACAO_RECARREGAR sempre usa o link
+        cancelamento: TokenCancelamento que interrompe as esperas
+
+    Returns:
+        dict: {'sucesso': bool, 'status': str, 'motivo': MotivoFalha ou None,
+               'navegacao': str, 'tempos': {fase: segundos}}
 
-def execute_numbers(contatos, progress_callback=None):
+    Raises:
+        EnvioCancelado: Se o cancelamento for pedido antes do clique em enviar
+    """
+    envio = iniciar_envio(driver, telephone, mensagem, nome_destinatario, navegacao, cancelamento=cancelamento)
+    return envio.concluir(driver, cancelamento=cancelamento)
+
+
+def _resultado_falha(motivo, modo, cronometro):
+    return {"sucesso": False, "status": "falha", "motivo": motivo, "navegacao": modo,
+            "tempos": cronometro.finalizar()}
+
+
+def execute_numbers(contatos, progress_callback=None, driver_service=None, navegacao=NAVEGACAO_NA_PAGINA,
+                    journal=None, campanha_id=None, total=None, metricas=None, agendador=None,
+                    cancelamento=None, tentativas=3, recarregar_a_cada=RECARREGAR_A_CADA, descartados=None):
     """
     Função para enviar mensagens para uma lista de contatos, com callback de progresso
 
+    Os envios são encadeados: enquanto a mensagem de um contato aguarda o tique, o número
+    do próximo já é buscado no painel lateral (modo na página). Contatos vindos de um
+    gerador são preparados numa thread produtora, em paralelo com a abertura do navegador.
+
     Args:
-        contatos: Lista de dicionários com 'nome' e 'telefone' para cada contato
-        mensagem: Texto da mensagem a ser enviada
+        contatos: Lista (ou gerador) de dicionários com 'nome', 'telefone' e 'mensagem' para cada contato
         progress_callback: Função de callback para atualizar o progresso na interface
             Assinatura: progress_callback(atual, total, status_text, success=True)
+        driver_service: DriverService compartilhado entre campanhas. Quando informado, o
+            navegador permanece aberto ao final; caso contrário é aberto e fechado aqui
+        navegacao: Modo de abertura das conversas (ver enviar_mensagem)
+        journal: CampaignJournal onde cada tentativa é registrada. Junto com campanha_id,
+            permite retomar a campanha pulando os telefones já enviados
+        total: Quantidade de contatos, obrigatória quando contatos for um gerador
+        metricas: RegistroMetricas que recebe os tempos da sessão, de cada contato e da campanha
+        agendador: AgendadorEnvio que define o ritmo, o horário permitido e a pausa dos envios.
+            Sem agendador, cada envio começa assim que o anterior é confirmado
+        cancelamento: TokenCancelamento. Ao ser pedido, as esperas são interrompidas, a mensagem
+            já clicada tem alguns segundos para ser confirmada e os contatos restantes não são
+            tentados nem registrados
+        tentativas: Máximo de tentativas por contato. Falhas transitórias (ver retry_queue) são
+            tentadas novamente ao final da campanha, com espera crescente; falhas permanentes
+            (número inválido ou sem conta) e qualquer falha depois do clique nunca são repetidas
+        recarregar_a_cada: No modo na página, recarrega o WhatsApp Web depois desse número de
+            conversas abertas sem recarga, sem mensagem pendente. 0 ou None desativa
+        descartados: Função que retorna quantas das `total` linhas a preparação já descartou
+            (inválidas, repetidas ou incompletas), para o progresso e o tempo restante chegarem
+            ao total real. Desnecessária quando total já conta só os contatos válidos
 
     Returns:
-        dict: Estatísticas do envio {'total': n, 'enviadas': n, 'falhas': n}
+        dict: Estatísticas do envio {'total': n, 'enviadas': n, 'falhas': n, 'puladas': n,
+              'retentativas': n, 'cancelado': bool}
     """
+    if total is None:
+        total = len(contatos)
+
+    def total_atual():
+        """Contatos a enviar: as linhas descartadas na preparação saem do total à medida que são lidas"""
+        return total - descartados() if descartados else total
+
+    # A preparação dos contatos começa antes (e durante) a abertura do navegador
+    produtor = None
+    if not isinstance(contatos, (list, tuple)):
+        contatos = produtor = ProdutorContatos(contatos)
+
     # Iniciar a sessão do WhatsApp (usuário escaneia o QR code uma única vez)
     if progress_callback:
-        progress_callback(0, len(contatos), "Iniciando sessão do WhatsApp... Escaneie o QRCode", True)
+        progress_callback(0, total_atual(), "Iniciando sessão do WhatsApp... Escaneie o QRCode se solicitado", True)
 
-    driver = iniciar_sessao_whatsapp()
+    inicio_campanha = time.perf_counter()
+    try:
+        with metricas.cronometrar("sessao", campanha=campanha_id) if metricas else nullcontext():
+            driver = (driver_service.obter(cancelamento) if driver_service
+                      else iniciar_sessao_whatsapp(cancelamento=cancelamento))
+    except BaseException:
+        # Ex.: o Firefox não abriu (geckodriver ausente, perfil em uso); a produção é interrompida
+        if produtor:
+            produtor.fechar()
+        raise
+
+    def cancelado():
+        return cancelamento is not None and cancelamento.cancelado
 
     if not driver:
+        if produtor:
+            produtor.fechar()
+        if cancelado():
+            if progress_callback:
+                progress_callback(0, total_atual(), "Envio cancelado antes de iniciar.", False)
+            return {"total": total_atual(), "enviadas": 0, "falhas": 0, "puladas": 0, "retentativas": 0, "cancelado": True}
         if progress_callback:
-            progress_callback(0, len(contatos), "Não foi possível iniciar a sessão do WhatsApp.", False)
-        return {"total": len(contatos), "enviadas": 0, "falhas": len(contatos)}
+            progress_callback(0, total_atual(), "Não foi possível iniciar a sessão do WhatsApp.", False)
+        return {"total": total_atual(), "enviadas": 0, "falhas": total_atual(), "puladas": 0, "retentativas": 0, "cancelado": False}
 
     # Contador para estatísticas
-    enviadas = 0
-    falhas = 0
-    total = len(contatos)
+    estatisticas = {"total": total_atual(), "enviadas": 0, "falhas": 0, "puladas": 0, "retentativas": 0,
+                    "cancelado": False}
+
+    # Contatos com falha transitória, tentados novamente ao final
+    retentativas = FilaRetentativas(tentativas)
+
+    # Telefones já enviados em uma execução anterior desta campanha
+    ja_enviados = journal.concluidos(campanha_id) if journal else set()
+
+    def concluir(envio, contato, chave, posicao, tentativa=1):
+        resultado = envio.concluir(driver, cancelamento=cancelamento)
+        if metricas:
+            metricas.registrar_contato(campanha_id, chave, resultado)
+        if journal:
+            motivo = resultado["motivo"].value if resultado["motivo"] else None
+            journal.registrar(campanha_id, chave, envio.nome, resultado["status"], motivo,
+                              duracao=resultado["tempos"].get("total"))
+        if resultado["sucesso"]:
+            estatisticas["enviadas"] += 1
+            if progress_callback:
+                progress_callback(posicao, total_atual(), f"Enviado com sucesso para {envio.nome}", True)
+        elif retentativas.adicionar(contato, resultado["motivo"], tentativa):
+            if progress_callback:
+                progress_callback(posicao, total_atual(), f"Falha ao enviar para {envio.nome} "
+                                                  f"({resultado['motivo'].value}), nova tentativa ao final", False)
+        else:
+            estatisticas["falhas"] += 1
+            if progress_callback:
+                progress_callback(posicao, total_atual(),
+                                  f"Falha ao enviar para {envio.nome} ({resultado['motivo'].value})", False)
+
+    # Mensagem clicada que ainda aguarda o tique: (envio, contato, chave, posição)
+    anterior = None
+
+    # Conversas abertas desde o último carregamento completo do WhatsApp Web
+    sem_recarga = 0
 
     try:
         # Enviar mensagem para cada contato
         for i, contato in enumerate(contatos):
+            if cancelado():
+                break
+
             nome = contato['nome']
             telefone = contato['telefone']
             mensagem = contato['mensagem']
+            chave = telefone_canonico(telefone)
 
-            if progress_callback:
-                progress_callback(i, total, f"Enviando para {nome}...", True)
-
-            if enviar_mensagem(driver, telefone, mensagem, nome):
-                enviadas += 1
+            if (chave or str(telefone)) in ja_enviados:
+                estatisticas["puladas"] += 1
                 if progress_callback:
-                    progress_callback(i + 1, total, f"Enviado com sucesso para {nome}", True)
-            else:
-                falhas += 1
+                    progress_callback(i + 1, total_atual(), f"{nome} já recebeu a mensagem, pulando", True)
+                continue
+
+            # O agendador decide quando o próximo envio pode começar (ritmo, horário e pausa)
+            if agendador and not agendador.aguardar(
+                    deve_parar=cancelado,
+                    ao_esperar=(lambda texto: progress_callback(i, total_atual(), texto, True)) if progress_callback else None):
+                break
+
+            try:
+                # Recarrega o aplicativo periodicamente, num ponto seguro (sem mensagem pendente),
+                # para a memória da aba não crescer ao longo de campanhas longas
+                if recarregar_a_cada and navegacao == NAVEGACAO_NA_PAGINA and sem_recarga >= recarregar_a_cada:
+                    if anterior:
+                        concluir(*anterior)
+                        anterior = None
+                    print("Recarregando o WhatsApp Web para liberar memória...")
+                    try:
+                        with metricas.cronometrar("recarga", campanha=campanha_id) if metricas else nullcontext():
+                            recarregar_aplicativo(driver, cancelamento)
+                    except EnvioCancelado:
+                        raise
+                    except Exception as e:
+                        print(f"Erro ao recarregar o WhatsApp Web: {e}")
+                    sem_recarga = 0
+
+                # Busca o próximo número no painel lateral enquanto a mensagem anterior é confirmada em #main;
+                # se a busca falhar, o link send?phone= só é aberto depois da confirmação
+                modo = navegacao
+                resultado_busca = None
+                if anterior and chave and navegacao == NAVEGACAO_NA_PAGINA:
+                    resultado_busca = buscar_conversa(driver, chave, cancelamento=cancelamento)
+                    if resultado_busca is None:
+                        modo = NAVEGACAO_RECARREGAR
+
+                if anterior:
+                    concluir(*anterior)
+                    anterior = None
+
                 if progress_callback:
-                    progress_callback(i + 1, total, f"Falha ao enviar para {nome}", False)
+                    progress_callback(i, total_atual(), f"Enviando para {nome}...", True)
+
+                envio = iniciar_envio(driver, telefone, mensagem, nome, modo, resultado_busca, cancelamento)
+                anterior = (envio, contato, chave or str(telefone), i + 1)
+                if envio.modo == NAVEGACAO_NA_PAGINA:
+                    sem_recarga += 1
+                elif envio.modo == NAVEGACAO_RECARREGAR:
+                    sem_recarga = 0  # O link send?phone= já recarregou a página
+            except EnvioCancelado:
+                # O contato atual não chegou a ser enviado; não é contado nem registrado
+                break
+
+        # A mensagem já clicada é sempre concluída (com prazo curto se o envio foi cancelado)
+        if anterior:
+            concluir(*anterior)
+            anterior = None
+
+        # Novas tentativas dos contatos com falha transitória, respeitando a espera de cada um
+        while not cancelado():
+            proximo = retentativas.proximo(deve_parar=cancelado)
+            if proximo is None:
+                break
+            contato, tentativa = proximo
+            nome = contato['nome']
 
-            # Pequena pausa para evitar sobrecarga
-            time.sleep(2)
+            # Reconecta se a sessão caiu (causa comum de falhas transitórias em sequência)
+            if driver_service:
+                driver = driver_service.obter(cancelamento)
+                if not driver:
+                    estatisticas["falhas"] += 1
+                    break
+            if agendador and not agendador.aguardar(deve_parar=cancelado):
+                estatisticas["falhas"] += 1
+                break
+
+            if progress_callback:
+                progress_callback(total_atual(), total_atual(), f"Nova tentativa ({tentativa}/{tentativas}) para {nome}...", True)
+            try:
+                envio = iniciar_envio(driver, contato['telefone'], contato['mensagem'], nome, navegacao,
+                                      cancelamento=cancelamento)
+            except EnvioCancelado:
+                estatisticas["falhas"] += 1
+                break
+            estatisticas["retentativas"] += 1
+            concluir(envio, contato, telefone_canonico(contato['telefone']) or str(contato['telefone']),
+                     total_atual(), tentativa)
+
+        # Contatos que ainda aguardavam nova tentativa quando o envio foi interrompido
+        estatisticas["falhas"] += len(retentativas)
 
         # Resultado final
-        status_final = f"Concluído! Enviadas: {enviadas}, Falhas: {falhas}"
+        estatisticas["total"] = total_atual()
+        estatisticas["cancelado"] = cancelado()
+        status_final = (f"{'Envio cancelado' if estatisticas['cancelado'] else 'Concluído'}! "
+                        f"Enviadas: {estatisticas['enviadas']}, Falhas: {estatisticas['falhas']}, "
+                        f"Já enviadas antes: {estatisticas['puladas']}")
         if progress_callback:
-            progress_callback(total, total, status_final, True)
+            atual = (estatisticas["enviadas"] + estatisticas["falhas"] + estatisticas["puladas"]
+                     if estatisticas["cancelado"] else total_atual())
+            progress_callback(atual, total_atual(), status_final, not estatisticas["cancelado"])
 
-        return {
-            "total": total,
-            "enviadas": enviadas,
-            "falhas": falhas
-        }
+        if metricas:
+            metricas.observar("campanha", round(time.perf_counter() - inicio_campanha, 3))
+            metricas.registrar_campanha(campanha_id, estatisticas)
+        return estatisticas
 
     finally:
-        # Fechar o navegador ao final
-        print("\nFechando o navegador...")
-        driver.quit()
+        # Se a leitura dos contatos falhar no meio da lista, a mensagem já clicada ainda é
+        # confirmada e registrada, para uma nova execução não enviá-la outra vez
+        if anterior:
+            try:
+                concluir(*anterior)
+            except Exception as e:
+                print(f"Erro ao registrar a mensagem de {anterior[0].nome}: {e}")
+        if produtor:
+            produtor.fechar()
+        # Fechar o navegador ao final, a menos que a sessão seja compartilhada
+        if not driver_service:
+            print("\nFechando o navegador...")
+            driver.quit()